@@ -40,8 +40,14 @@ from .interface import Interface
 from .introspection import Introspection
 from .mapping import Mapping
 from .pairing_handler import (
+    aregister_device_with_jwt_token,
+    aregister_device_with_private_key,
+    clear_verify_cache,
     generate_device_id,
+    generate_device_ids,
     generate_random_device_id,
     register_device_with_jwt_token,
     register_device_with_private_key,
+    register_devices_with_private_key,
+    verify_device_certificate,
 )
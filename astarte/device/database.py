@@ -255,7 +255,7 @@ class AstarteDatabaseSQLite(AstarteDatabase):
             .execute("SELECT * FROM properties")
             .fetchall()
         )
-        parsed_properties = []
-        for interface, major, path, value in properties:
-            parsed_properties += [(interface, major, path, pickle.loads(value))]
-        return parsed_properties
+        return [
+            (interface, major, path, pickle.loads(value))
+            for interface, major, path, value in properties
+        ]
@@ -520,9 +520,10 @@ class DeviceMqtt(Device):
             data_payload = payload_object["v"]
 
         # Get interface name and path
-        topic_tokens = msg.topic.replace(f"{self.__get_base_topic()}/", "").split("/")
-        interface_name = topic_tokens[0]
-        interface_path = "/" + "/".join(topic_tokens[1:])
+        interface_name, _, interface_path = msg.topic.replace(
+            f"{self.__get_base_topic()}/", ""
+        ).partition("/")
+        interface_path = "/" + interface_path
 
         self._on_message_generic(interface_name, interface_path, data_payload)
 
@@ -620,12 +621,12 @@ class DeviceMqtt(Device):
         decompressed_payload = zlib.decompress(payload[4:]).decode("utf-8")
         if decompressed_payload:
             # Parse the received list of set properties.
-            for full_path in [p.split("/") for p in decompressed_payload.split(";")]:
-                interface_name = full_path[0]
+            for full_path in decompressed_payload.split(";"):
+                interface_name, _, interface_path = full_path.partition("/")
                 if not self._introspection.get_interface(interface_name):
                     logging.debug("Purge list entry %s missing from introspection.", interface_name)
                     continue
-                allowed_properties.append((interface_name, "/" + "/".join(full_path[1:])))
+                allowed_properties.append((interface_name, "/" + interface_path))
 
         # Delete all the properties not in the received list.
         for interface_name, _, interface_path, _ in self.__prop_database.load_all_props():
@@ -18,9 +18,14 @@
 
 from __future__ import annotations
 
+import asyncio
+import functools
+import hashlib
 import http
+import time
 from base64 import urlsafe_b64encode
-from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from threading import Lock
 from uuid import UUID, uuid4, uuid5
 
 import jwt
@@ -29,6 +34,15 @@ import requests
 from . import crypto, exceptions
 
 DEFAULT_TIMEOUT = 30
+# Built once at import, a set display made of enum members is rebuilt on every evaluation
+_AUTH_ERROR_CODES = frozenset({http.HTTPStatus.UNAUTHORIZED, http.HTTPStatus.FORBIDDEN})
+
+# Seconds for which a certificate verification result is reused without querying Astarte
+VERIFY_CACHE_TTL = 60
+# Cache of the positive verification results in the format:
+# (pairing base url, realm, device id, secret and cert fingerprint) -> time
+_verify_cache: dict[tuple[str, str, str, bytes], float] = {}
+_verify_cache_lock = Lock()
 
 
 def register_device_with_private_key(
@@ -71,6 +85,70 @@ def register_device_with_private_key(
     )
 
 
+def register_devices_with_private_key(
+    device_ids: list[str],
+    realm: str,
+    private_key_file: str,
+    pairing_base_url: str,
+    ignore_ssl_errors: bool,
+) -> tuple[dict[str, str], dict[str, Exception]]:
+    """
+    Registers multiple devices against an Astarte instance/realm with a Private Key
+
+    The authorization token is generated once and a single HTTP session is used for all the
+    registrations, sparing a TCP connection and a TLS handshake for each device.
+
+    A failed registration does not stop the remaining ones. Since Pairing API returns the
+    credentials secret of a device only once, the secrets of the devices registered successfully
+    are always returned, together with the errors of the devices that could not be registered.
+
+    Parameters
+    ----------
+    device_ids : list[str]
+        The device IDs to register.
+    realm : str
+        The Realm in which to register the devices.
+    private_key_file : str
+        Path to the Private Key file for the Realm. It will be used to Authenticate against
+        Pairing API.
+    pairing_base_url : str
+        The Base URL of Pairing API of the Astarte Instance the devices will be registered in.
+    ignore_ssl_errors: bool
+        Set to True to ignore SSL errors
+
+    Returns
+    -------
+    tuple[dict[str, str], dict[str, Exception]]
+        The credentials secrets obtained after the registration, indexed by device ID, and the
+        errors raised for the devices that could not be registered, indexed by device ID.
+        The errors can be an AuthorizationError, a DeviceAlreadyRegisteredError, an APIError,
+        a requests.RequestException for connection failures or a KeyError or ValueError for
+        responses with a malformed or non JSON body.
+
+    Raises
+    ------
+    JWTGenerationError
+        If there is an error generating the token from the private key
+    """
+    headers = __register_device_headers_with_private_key(private_key_file)
+    secrets = {}
+    errors = {}
+    with requests.Session() as session:
+        for device_id in device_ids:
+            try:
+                secrets[device_id] = __register_device(
+                    device_id, realm, headers, pairing_base_url, ignore_ssl_errors, session
+                )
+            except (
+                exceptions.AstarteError,
+                requests.RequestException,
+                KeyError,
+                ValueError,
+            ) as exc:
+                errors[device_id] = exc
+    return secrets, errors
+
+
 def register_device_with_jwt_token(
     device_id: str,
     realm: str,
@@ -113,6 +191,96 @@ def register_device_with_jwt_token(
     )
 
 
+async def aregister_device_with_private_key(
+    device_id: str,
+    realm: str,
+    private_key_file: str,
+    pairing_base_url: str,
+    ignore_ssl_errors: bool,
+) -> str:
+    """
+    Asynchronous version of register_device_with_private_key.
+
+    The blocking HTTP request is run in the default executor of the running loop, so that
+    multiple registrations can be awaited concurrently (e.g. with asyncio.gather).
+
+    Parameters
+    ----------
+    device_id : str
+        The device ID to register.
+    realm : str
+        The Realm in which to register the device.
+    private_key_file : str
+        Path to the Private Key file for the Realm. It will be used to Authenticate against
+        Pairing API.
+    pairing_base_url : str
+        The Base URL of Pairing API of the Astarte Instance the device will be registered in.
+    ignore_ssl_errors: bool
+        Set to True to ignore SSL errors
+
+    Returns
+    -------
+    str
+        The credentials secret obtained after the registration
+    """
+    return await asyncio.get_running_loop().run_in_executor(
+        None,
+        functools.partial(
+            register_device_with_private_key,
+            device_id,
+            realm,
+            private_key_file,
+            pairing_base_url,
+            ignore_ssl_errors,
+        ),
+    )
+
+
+async def aregister_device_with_jwt_token(
+    device_id: str,
+    realm: str,
+    jwt_token: str,
+    pairing_base_url: str,
+    ignore_ssl_errors: bool = False,
+) -> str:
+    """
+    Asynchronous version of register_device_with_jwt_token.
+
+    The blocking HTTP request is run in the default executor of the running loop, so that
+    multiple registrations can be awaited concurrently (e.g. with asyncio.gather).
+
+    Parameters
+    ----------
+    device_id : str
+        The device ID to register.
+    realm : str
+        The Realm in which to register the device.
+    jwt_token : str
+        A JWT Token to Authenticate against Pairing API. The token must have access to Pairing
+        API and to the agent API paths.
+    pairing_base_url : str
+        The Base URL of Pairing API of the Astarte Instance the device will be registered in.
+    ignore_ssl_errors: bool
+        Set to True to ignore SSL errors. Defaults to `false`.
+
+    Returns
+    -------
+    str
+        The credentials secret obtained after the registration
+    """
+    return await asyncio.get_running_loop().run_in_executor(
+        None,
+        functools.partial(
+            register_device_with_jwt_token,
+            device_id,
+            realm,
+            jwt_token,
+            pairing_base_url,
+            ignore_ssl_errors,
+        ),
+    )
+
+
 def generate_device_id(namespace: UUID, unique_data: str) -> str:
     """
     Deterministically generate a device Id based on UUID namespace identifier and unique data.
@@ -138,6 +306,44 @@ def generate_device_id(namespace: UUID, unique_data: str) -> str:
     return urlsafe_b64encode(device_id.bytes).replace(b"=", b"").decode("utf-8")
 
 
+def generate_device_ids(namespace: UUID, unique_data_list: list[str]) -> list[str]:
+    """
+    Deterministically generate multiple device Ids based on UUID namespace identifier and a list
+    of unique data.
+
+    Equivalent to calling generate_device_id for each element of the list, but the namespace is
+    hashed only once and each device Id is computed from a copy of the hashing context.
+
+    Parameters
+    ----------
+    namespace: UUID
+        UUID namespace of the device_ids
+    unique_data_list: list[str]
+        devices unique data used to generate the device_ids
+
+    Returns
+    -------
+    list[str]
+        the generated device Ids, using the standard Astarte device ID encoding (base64
+        urlencoding without padding). The order matches the one of the unique data.
+
+    """
+    namespace_hash = hashlib.sha1(namespace.bytes)
+
+    device_ids = []
+    for unique_data in unique_data_list:
+        name_hash = namespace_hash.copy()
+        name_hash.update(unique_data.encode("utf-8"))
+        # set the version (5) and variant (RFC 4122) bits as done by uuid5
+        device_id = bytearray(name_hash.digest()[:16])
+        device_id[6] = (device_id[6] & 0x0F) | 0x50
+        device_id[8] = (device_id[8] & 0x3F) | 0x80
+        # encode the device_id and strip down the padding
+        device_ids.append(urlsafe_b64encode(device_id)[:-2].decode("ascii"))
+
+    return device_ids
+
+
 def generate_random_device_id() -> str:
     """
     Quick way to generate a device Id.
@@ -196,19 +402,20 @@ def obtain_device_certificate(
     headers = {"Authorization": f"Bearer {credentials_secret}"}
     data = {"data": {"csr": csr.decode("ascii")}}
 
-    res = requests.post(
+    res = __request(
+        "POST",
         f"{pairing_base_url}/v1/{realm}/devices/{device_id}/protocols/astarte_mqtt_v1/credentials",
-        json=data,
         headers=headers,
-        verify=not ignore_ssl_errors,
-        timeout=DEFAULT_TIMEOUT,
+        ignore_ssl_errors=ignore_ssl_errors,
+        json=data,
     )
-    if res.status_code in {http.HTTPStatus.UNAUTHORIZED, http.HTTPStatus.FORBIDDEN}:
-        raise exceptions.AuthorizationError(res.json())
+    body = res.json()
+    if res.status_code in _AUTH_ERROR_CODES:
+        raise exceptions.AuthorizationError(body)
     if res.status_code != http.HTTPStatus.CREATED:
-        raise exceptions.APIError(res.json())
+        raise exceptions.APIError(body)
 
-    crypto.import_device_certificate(res.json()["data"]["client_crt"], crypto_store_dir)
+    crypto.import_device_certificate(body["data"]["client_crt"], crypto_store_dir)
 
 
 def verify_device_certificate(
@@ -218,10 +425,15 @@ def verify_device_certificate(
     pairing_base_url: str,
     ignore_ssl_errors: bool,
     cert_pem: str,
+    use_cache: bool = False,
 ) -> bool:
     """
     Utility function that verifies the validity of a device certificate with Astarte
 
+    When use_cache is set, a positive result is reused for VERIFY_CACHE_TTL seconds for the same
+    Pairing API, realm, device, credentials secret and certificate. Use clear_verify_cache to
+    force a new verification.
+
     Parameters
     ----------
     device_id: str
@@ -236,6 +448,8 @@ def verify_device_certificate(
         Set to True to ignore SSL errors
     cert_pem: str
         Certificate to verify in the PEM format
+    use_cache: bool
+        Set to True to reuse a recent positive verification result. Defaults to False.
 
     Raises
     ------
@@ -250,23 +464,49 @@ def verify_device_certificate(
         True if the certificate is valid, False otherwise.
     """
 
+    # Reuse a recent positive verification result for the same certificate and credentials
+    if use_cache:
+        fingerprint = hashlib.sha256(f"{credentials_secret}\n{cert_pem}".encode("utf-8")).digest()
+        cache_key = (pairing_base_url, realm, device_id, fingerprint)
+        with _verify_cache_lock:
+            cached = _verify_cache.get(cache_key)
+        if cached is not None and time.monotonic() - cached < VERIFY_CACHE_TTL:
+            return True
+
     # Prepare the Pairing API request
     headers = {"Authorization": f"Bearer {credentials_secret}"}
     data = {"data": {"client_crt": cert_pem}}
 
-    res = requests.post(
+    res = __request(
+        "POST",
         f"{pairing_base_url}/v1/{realm}/devices/{device_id}/protocols/astarte_mqtt_v1/credentials/verify",
-        json=data,
         headers=headers,
-        verify=not ignore_ssl_errors,
-        timeout=DEFAULT_TIMEOUT,
+        ignore_ssl_errors=ignore_ssl_errors,
+        json=data,
     )
-    if res.status_code in {http.HTTPStatus.UNAUTHORIZED, http.HTTPStatus.FORBIDDEN}:
-        raise exceptions.AuthorizationError(res.json())
+    body = res.json()
+    if res.status_code in _AUTH_ERROR_CODES:
+        raise exceptions.AuthorizationError(body)
     if res.status_code != http.HTTPStatus.OK:
-        raise exceptions.APIError(res.json())
+        raise exceptions.APIError(body)
 
-    return res.json().get("data", False).get("valid", False)
+    # Guard against a missing or null "data" field in the response
+    data = body.get("data") or {}
+    valid = bool(data.get("valid"))
+
+    # Invalid results are not cached, a new verification could succeed
+    if use_cache and valid:
+        with _verify_cache_lock:
+            _verify_cache[cache_key] = time.monotonic()
+    return valid
+
+
+def clear_verify_cache() -> None:
+    """
+    Clear the cached results of verify_device_certificate.
+    """
+    with _verify_cache_lock:
+        _verify_cache.clear()
 
 
 def obtain_device_transport_information(
@@ -308,18 +548,19 @@ def obtain_device_transport_information(
     # Prepare the Pairing API request
     headers = {"Authorization": f"Bearer {credentials_secret}"}
 
-    res = requests.get(
+    res = __request(
+        "GET",
         f"{pairing_base_url}/v1/{realm}/devices/{device_id}",
         headers=headers,
-        verify=not ignore_ssl_errors,
-        timeout=DEFAULT_TIMEOUT,
+        ignore_ssl_errors=ignore_ssl_errors,
     )
-    if res.status_code in {http.HTTPStatus.UNAUTHORIZED, http.HTTPStatus.FORBIDDEN}:
-        raise exceptions.AuthorizationError(res.json())
+    body = res.json()
+    if res.status_code in _AUTH_ERROR_CODES:
+        raise exceptions.AuthorizationError(body)
     if res.status_code != http.HTTPStatus.OK:
-        raise exceptions.APIError(res.json())
+        raise exceptions.APIError(body)
 
-    return res.json()["data"]
+    return body["data"]
 
 
 def __register_device(
@@ -328,6 +569,7 @@ def __register_device(
     headers: dict,
     pairing_base_url: str,
     ignore_ssl_errors: bool,
+    session: requests.Session | None = None,
 ) -> str:
     """
     Private utility Function that registers a new device
@@ -344,6 +586,8 @@ def __register_device(
         Base URL for the Astarte Pairing APIs
     ignore_ssl_errors: bool
         Set to True to ignore SSL errors
+    session: requests.Session | None
+        Optional HTTP session to reuse, when None a new connection is opened for the request.
 
     Returns
     -------
@@ -361,21 +605,67 @@ def __register_device(
     """
     data = {"data": {"hw_id": device_id}}
 
-    res = requests.post(
+    res = __request(
+        "POST",
         f"{pairing_base_url}/v1/{realm}/agent/devices",
-        json=data,
         headers=headers,
-        verify=not ignore_ssl_errors,
-        timeout=DEFAULT_TIMEOUT,
+        ignore_ssl_errors=ignore_ssl_errors,
+        json=data,
+        session=session,
     )
-    if res.status_code in {http.HTTPStatus.UNAUTHORIZED, http.HTTPStatus.FORBIDDEN}:
-        raise exceptions.AuthorizationError(res.json())
+    # The body is not needed to report an already registered device
     if res.status_code == http.HTTPStatus.UNPROCESSABLE_ENTITY:
         raise exceptions.DeviceAlreadyRegisteredError()
+    body = res.json()
+    if res.status_code in _AUTH_ERROR_CODES:
+        raise exceptions.AuthorizationError(body)
     if res.status_code != http.HTTPStatus.CREATED:
-        raise exceptions.APIError(res.json())
+        raise exceptions.APIError(body)
+
+    return body["data"]["credentials_secret"]
+
+
+def __request(
+    method: str,
+    url: str,
+    *,
+    headers: dict,
+    ignore_ssl_errors: bool,
+    json: dict | None = None,
+    session: requests.Session | None = None,
+) -> requests.Response:
+    """
+    Private utility function that performs an HTTP request to the Astarte APIs, applying the
+    common SSL verification and timeout settings.
+
+    Parameters
+    ----------
+    method: str
+        HTTP method for the request.
+    url: str
+        URL for the request.
+    headers: dict
+        HTTP connection headers
+    ignore_ssl_errors: bool
+        Set to True to ignore SSL errors
+    json: dict | None
+        Optional body for the request, it will be serialized as JSON.
+    session: requests.Session | None
+        Optional HTTP session to reuse, when None a new connection is opened for the request.
 
-    return res.json()["data"]["credentials_secret"]
+    Returns
+    -------
+    requests.Response
+        The response to the request.
+    """
+    return (session or requests).request(
+        method,
+        url,
+        headers=headers,
+        json=json,
+        verify=not ignore_ssl_errors,
+        timeout=DEFAULT_TIMEOUT,
+    )
 
 
 def __register_device_headers_with_private_key(private_key_file) -> dict:
@@ -463,17 +753,18 @@ def __generate_token(
         "pairing": "a_pa",
     }
 
-    with open(private_key_file, "r", encoding="utf-8") as pk:
-        private_key_pem = pk.read()
-
-        if key_type == "channels" and not auth_paths:
-            real_auth_paths = ["JOIN::.*", "WATCH::.*"]
-        else:
-            real_auth_paths = [".*::.*"]
-        now = datetime.now(timezone.utc)
-        claims = {api_claims[key_type]: real_auth_paths, "iat": now}
-        if expiry > 0:
-            claims["exp"] = now + timedelta(seconds=expiry)
-
-        encoded = jwt.encode(claims, private_key_pem, algorithm="RS256")
-        return encoded.decode()
+    # Read the key as raw bytes, the JWT backend would re-encode a decoded string anyway
+    private_key_pem = Path(private_key_file).read_bytes()
+
+    if key_type == "channels" and not auth_paths:
+        real_auth_paths = ["JOIN::.*", "WATCH::.*"]
+    else:
+        real_auth_paths = [".*::.*"]
+    # Use NumericDate values (seconds since the epoch) directly, as mandated by the JWT spec
+    now = int(time.time())
+    claims = {api_claims[key_type]: real_auth_paths, "iat": now}
+    if expiry > 0:
+        claims["exp"] = now + expiry
+
+    encoded = jwt.encode(claims, private_key_pem, algorithm="RS256")
+    return encoded.decode()
@@ -19,38 +19,43 @@
 Contains the tests for aggregated object datastreams.
 """
 
-import copy
-import time
-from threading import Lock
-
-from config import TestCfg
-from dateutil import parser
-from http_requests import (
-    get_server_interface,
+from termcolor import cprint
+
+from astarte.device.device import Device
+from e2etest.common.config import TestCfg
+from e2etest.common.http_requests import (
     parse_received_data,
     post_server_interface,
     prepare_transmit_data,
+    wait_server_interface,
 )
-from termcolor import cprint
-
-from astarte.device.device import Device
+from e2etest.common.rx_data import RxData
 
 
 def test_aggregate_from_device_to_server(device: Device, test_cfg: TestCfg):
     """
     Test for aggregated object datastreams in the direction from device to server
     """
+
+    def _stored_mock_data(data: dict):
+        stored = data.get("sensor_id")
+        if isinstance(stored, list):
+            stored = stored[-1] if stored else None
+        if not stored:
+            return False
+        stored = {k: v for k, v in stored.items() if k != "timestamp"}
+        parse_received_data(stored)
+        return stored == test_cfg.mock_data
+
     cprint(
         "\nSending device owned aggregates from device to server.",
         color="cyan",
         flush=True,
     )
-    device.send_aggregate(test_cfg.interface_device_aggr, "/sensor_id", test_cfg.mock_data)
-
-    time.sleep(1)
+    device.send_aggregate(test_cfg.interface_device_aggr, "/sensor_id", dict(test_cfg.mock_data))
 
     cprint("\nChecking data stored on the server.", color="cyan", flush=True)
-    json_res = get_server_interface(test_cfg, test_cfg.interface_device_aggr)
+    json_res = wait_server_interface(test_cfg, test_cfg.interface_device_aggr, _stored_mock_data)
     parsed_res = json_res.get("data", {}).get("sensor_id")
     if not parsed_res:
         raise ValueError("Incorrectly formatted response from server")
@@ -67,7 +72,7 @@ def test_aggregate_from_device_to_server(device: Device, test_cfg: TestCfg):
         raise ValueError("Incorrect data stored on server")
 
 
-def test_aggregate_from_server_to_device(test_cfg: TestCfg, rx_data_lock: Lock, rx_data: dict):
+def test_aggregate_from_server_to_device(test_cfg: TestCfg, rx_data: RxData):
     """
     Test for aggregated object datastreams in the direction from server to device
     """
@@ -83,15 +88,17 @@ def test_aggregate_from_server_to_device(test_cfg: TestCfg, rx_data_lock: Lock,
 
     post_server_interface(test_cfg, test_cfg.interface_server_aggr, "/sensor_id", mock_data_cpy)
 
-    time.sleep(1)
-
     cprint("\nChecking data received by the device.", color="cyan", flush=True)
-    with rx_data_lock:
-        if not rx_data.get(test_cfg.interface_server_aggr):
-            raise ValueError(
-                f"No data from this interface has been received {test_cfg.interface_server_aggr}"
-            )
-        parsed_rx_data = rx_data.get(test_cfg.interface_server_aggr).get("/sensor_id")
+    rx_data.wait_for(
+        test_cfg.interface_server_aggr, lambda data: data.get("/sensor_id") == test_cfg.mock_data
+    )
+
+    received = rx_data.get(test_cfg.interface_server_aggr)
+    if not received:
+        raise ValueError(
+            f"No data from this interface has been received {test_cfg.interface_server_aggr}"
+        )
+    parsed_rx_data = received.get("/sensor_id")
 
     # Make sure all the data has been correctly received
     if parsed_rx_data != test_cfg.mock_data:
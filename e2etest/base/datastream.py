@@ -18,60 +18,76 @@
 """
 Contains the tests for individual datastreams.
 """
-import time
+
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from threading import Lock
 
-from config import TestCfg
-from http_requests import (
-    get_server_interface,
+from termcolor import cprint
+
+from astarte.device.device import Device
+from e2etest.common.config import TestCfg
+from e2etest.common.http_requests import (
     parse_received_data,
     post_server_interface,
     prepare_transmit_data,
+    wait_server_interface,
 )
-from termcolor import cprint
-
-from astarte.device.device import Device
+from e2etest.common.rx_data import RxData
+from e2etest.common.utils import drive_mock_data
 
 
 def test_datastream_from_device_to_server(device: Device, test_cfg: TestCfg):
     """
     Test for individual datastreams in the direction from device to server
     """
+
+    def _stored_mock_data(data: dict):
+        # Values from a previous run could still be stored, compare the full content
+        parsed_data = {key: value.get("value") for key, value in data.items()}
+        parse_received_data(parsed_data)
+        return parsed_data == test_cfg.mock_data
+
     cprint(
         "\nSending device owned datastreams from device to server.",
         color="cyan",
         flush=True,
     )
-    for key, value in test_cfg.mock_data.items():
-        device.send(test_cfg.interface_device_data, "/" + key, value, datetime.now(tz=timezone.utc))
-        time.sleep(0.005)
-
-    time.sleep(1)
+    drive_mock_data(
+        test_cfg,
+        lambda _key, path, value: device.send(
+            test_cfg.interface_device_data, path, value, datetime.now(tz=timezone.utc)
+        ),
+        test_cfg.data_paths,
+    )
 
     cprint("\nChecking data stored on the server.", color="cyan", flush=True)
-    json_res = get_server_interface(test_cfg, test_cfg.interface_device_data)
+    json_res = wait_server_interface(test_cfg, test_cfg.interface_device_data, _stored_mock_data)
     parsed_res = {key: value.get("value") for key, value in json_res.get("data", {}).items()}
     if not parsed_res:
         cprint("Received: " + str(json_res), "red", flush=True)
         raise ValueError("Incorrectly formatted response from server")
 
     # Make sure all the keys have been correctly received
-    if parsed_res.keys() != test_cfg.mock_data.keys():
+    if parsed_res.keys() != test_cfg.mock_data_keys:
         cprint("Expected: " + str(test_cfg.mock_data), "red", flush=True)
         cprint("Received: " + str(parsed_res), "red", flush=True)
-        raise ValueError("Incorrectly formatted response from server")
+        missing = sorted(test_cfg.mock_data_keys - parsed_res.keys())
+        extra = sorted(parsed_res.keys() - test_cfg.mock_data_keys)
+        raise ValueError(
+            f"Incorrectly formatted response from server, missing: {missing}, extra: {extra}"
+        )
 
     parse_received_data(parsed_res)
 
     # Check received and sent data match
-    if parsed_res != test_cfg.mock_data:
+    mismatched = [k for k, v in test_cfg.mock_data.items() if parsed_res[k] != v]
+    if mismatched:
         cprint("Expected: " + str(test_cfg.mock_data), "red", flush=True)
         cprint("Received: " + str(parsed_res), "red", flush=True)
-        raise ValueError("Incorrect data stored on server")
+        raise ValueError(f"Incorrect data stored on server for: {mismatched}")
 
 
-def test_datastream_from_server_to_device(test_cfg: TestCfg, rx_data_lock: Lock, rx_data: dict):
+def test_datastream_from_server_to_device(test_cfg: TestCfg, rx_data: RxData):
     """
     Test for individual datastreams in the direction from server to device
     """
@@ -81,28 +97,27 @@ def test_datastream_from_server_to_device(test_cfg: TestCfg, rx_data_lock: Lock,
         flush=True,
     )
 
-    for key, value in test_cfg.mock_data.items():
+    expected = {test_cfg.data_paths[k]: v for k, v in test_cfg.mock_data.items()}
+
+    def _post(key, path, value):
         value = prepare_transmit_data(key, value)
-        post_server_interface(test_cfg, test_cfg.interface_server_data, "/" + key, value)
-        time.sleep(0.005)
+        post_server_interface(test_cfg, test_cfg.interface_server_data, path, value)
 
-    time.sleep(1)
+    # The requests are independent, send them concurrently over the shared session
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        drive_mock_data(test_cfg, _post, test_cfg.data_paths, executor=executor)
 
     cprint("\nChecking data received by the device.", color="cyan", flush=True)
+    rx_data.wait_for(test_cfg.interface_server_data, lambda data: data == expected)
 
-    with rx_data_lock:
-        if not rx_data.get(test_cfg.interface_server_data):
-            raise ValueError(
-                f"No data from this interface has been received {test_cfg.interface_server_data}"
-            )
-        parsed_rx_data = rx_data.get(test_cfg.interface_server_data)
+    parsed_rx_data = rx_data.get(test_cfg.interface_server_data)
+    if not parsed_rx_data:
+        raise ValueError(
+            f"No data from this interface has been received {test_cfg.interface_server_data}"
+        )
 
     # Make sure all the data has been correctly received
-    if parsed_rx_data != {("/" + k): v for (k, v) in test_cfg.mock_data.items()}:
-        cprint(
-            "Expected: " + str({("/" + k): v for (k, v) in test_cfg.mock_data.items()}),
-            "red",
-            flush=True,
-        )
+    if parsed_rx_data != expected:
+        cprint("Expected: " + str(expected), "red", flush=True)
         cprint("Received: " + str(parsed_rx_data), "red", flush=True)
         raise ValueError("Incorrectly formatted response from server")
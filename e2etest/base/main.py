@@ -20,50 +20,37 @@ End to end testing framework.
 """
 import argparse
 import asyncio
-import importlib.util
 import os
 import sys
-import time
 from pathlib import Path
-from threading import Lock, Thread
+from threading import Event
 
 from termcolor import cprint
 
-# Assuming this script is called from the root folder of this project.
-prj_path = Path(os.getcwd())
+# Make the project packages importable independently from the working directory.
+prj_path = Path(__file__).resolve().parents[2]
 if str(prj_path) not in sys.path:
     sys.path.insert(0, str(prj_path))
 
 from astarte.device import DeviceGrpc, DeviceMqtt
-
-config_path = Path.joinpath(Path.cwd(), "e2etest", "common", "config.py")
-spec = importlib.util.spec_from_file_location("config", config_path)
-config = importlib.util.module_from_spec(spec)
-sys.modules["config"] = config
-spec.loader.exec_module(config)
-
-http_requests_path = Path.joinpath(Path.cwd(), "e2etest", "common", "http_requests.py")
-spec = importlib.util.spec_from_file_location("http_requests", http_requests_path)
-http_requests = importlib.util.module_from_spec(spec)
-sys.modules["http_requests"] = http_requests
-spec.loader.exec_module(http_requests)
-
-from aggregate import (
+from e2etest.base.aggregate import (
     test_aggregate_from_device_to_server,
     test_aggregate_from_server_to_device,
 )
-from config import TestCfg
-from datastream import (
+from e2etest.base.datastream import (
     test_datastream_from_device_to_server,
     test_datastream_from_server_to_device,
 )
-from property import (
+from e2etest.base.property import (
     test_properties_from_device_to_server,
     test_properties_from_server_to_device,
 )
+from e2etest.common.callback_loop import get_callback_loop
+from e2etest.common.config import PROJECT_ROOT, TestCfg
+from e2etest.common.rx_data import RxData
 
-rx_data_lock = Lock()
-rx_data = {}
+rx_data = RxData()
+connected = Event()
 
 
 def on_connected_cbk(_):
@@ -71,16 +58,14 @@ def on_connected_cbk(_):
     Callback for a connection event.
     """
     cprint("Device connected.", color="green", flush=True)
+    connected.set()
 
 
 def on_data_received_cbk(_, name: str, path: str, payload: dict):
     """
     Callback for a data reception event.
     """
-    with rx_data_lock:
-        if not rx_data.get(name):
-            rx_data[name] = {}
-        rx_data[name][path] = payload
+    rx_data.store(name, path, payload)
 
 
 def on_disconnected_cbk(_, reason: int):
@@ -94,7 +79,7 @@ def main(cb_loop: asyncio.AbstractEventLoop, test_cfg: TestCfg):
     """
     Generate the device and run the end to end tests.
     """
-    persistency_dir = Path.joinpath(Path.cwd(), "e2etest", "base", "build")
+    persistency_dir = PROJECT_ROOT / "e2etest" / "base" / "build"
     if not Path.is_dir(persistency_dir):
         os.makedirs(persistency_dir)
 
@@ -121,55 +106,28 @@ def main(cb_loop: asyncio.AbstractEventLoop, test_cfg: TestCfg):
     )
     device.connect()
 
-    time.sleep(1)
-
-    if not device.is_connected():
+    if not connected.wait(timeout=5) or not device.is_connected():
         print("Connection failed.", flush=True)
         sys.exit(1)
 
     test_datastream_from_device_to_server(device, test_cfg)
-
-    time.sleep(1)
-
-    test_datastream_from_server_to_device(test_cfg, rx_data_lock, rx_data)
-
-    time.sleep(1)
-
+    test_datastream_from_server_to_device(test_cfg, rx_data)
     test_aggregate_from_device_to_server(device, test_cfg)
-
-    time.sleep(1)
-
-    test_aggregate_from_server_to_device(test_cfg, rx_data_lock, rx_data)
-
-    time.sleep(1)
-
+    test_aggregate_from_server_to_device(test_cfg, rx_data)
     test_properties_from_device_to_server(device, test_cfg)
-
-    time.sleep(1)
-
-    test_properties_from_server_to_device(test_cfg, rx_data_lock, rx_data)
+    test_properties_from_server_to_device(test_cfg, rx_data)
 
     device.disconnect()
 
 
-def start_call_back_loop(loop: asyncio.AbstractEventLoop) -> None:
-    """
-    Start an asyncio event loop, used for the device call back.
-    """
-    asyncio.set_event_loop(loop)
-    loop.run_forever()
-
-
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--device_n", default=1, type=int)
     parser.add_argument("--mock_data_n", default=1, type=int)
     args = parser.parse_args()
 
-    # Generate an async loop and thread
-    call_back_loop = asyncio.new_event_loop()
-    call_back_thread = Thread(target=start_call_back_loop, args=[call_back_loop], daemon=True)
-    call_back_thread.start()
+    # Get the async loop and thread shared by the device callbacks
+    call_back_loop, call_back_thread = get_callback_loop()
 
     try:
         main(call_back_loop, TestCfg(device_n=args.device_n, mock_data_n=args.mock_data_n))
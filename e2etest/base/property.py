@@ -19,35 +19,42 @@
 Contains the tests for individual properties.
 """
 
-import time
-from threading import Lock
+from concurrent.futures import ThreadPoolExecutor
 
-from config import TestCfg
-from http_requests import (
+from termcolor import cprint
+
+from astarte.device.device import Device
+from e2etest.common.config import TestCfg
+from e2etest.common.http_requests import (
     delete_server_interface,
-    get_server_interface,
     parse_received_data,
     post_server_interface,
     prepare_transmit_data,
+    wait_server_interface,
 )
-from termcolor import cprint
-
-from astarte.device.device import Device
+from e2etest.common.rx_data import RxData
+from e2etest.common.utils import drive_mock_data
 
 
 def test_properties_from_device_to_server(device: Device, test_cfg: TestCfg):
     """
     Test for individual properties in the direction from device to server
     """
-    cprint("\nSet device owned properties.", color="cyan", flush=True)
-    for key, value in test_cfg.mock_data.items():
-        device.send(test_cfg.interface_device_prop, "/sensor_id/" + key, value)
-        time.sleep(0.005)
 
-    time.sleep(1)
+    def _stored_mock_data(data: dict):
+        parsed_data = dict(data.get("sensor_id", {}))
+        parse_received_data(parsed_data)
+        return parsed_data == test_cfg.mock_data
+
+    cprint("\nSet device owned properties.", color="cyan", flush=True)
+    drive_mock_data(
+        test_cfg,
+        lambda _key, path, value: device.send(test_cfg.interface_device_prop, path, value),
+        test_cfg.sensor_paths,
+    )
 
     cprint("\nChecking data stored on the server.", color="cyan", flush=True)
-    json_res = get_server_interface(test_cfg, test_cfg.interface_device_prop)
+    json_res = wait_server_interface(test_cfg, test_cfg.interface_device_prop, _stored_mock_data)
     parsed_res = json_res.get("data", {}).get("sensor_id")
     if not parsed_res:
         cprint("Response: " + str(json_res), "red", flush=True)
@@ -63,14 +70,16 @@ def test_properties_from_device_to_server(device: Device, test_cfg: TestCfg):
 
     # Unset all the properties
     cprint("\nUnset all the device owned properties.", color="cyan", flush=True)
-    for key, _ in test_cfg.mock_data.items():
-        device.unset_property(test_cfg.interface_device_prop, "/sensor_id/" + key)
-        time.sleep(0.005)
-
-    time.sleep(1)
+    drive_mock_data(
+        test_cfg,
+        lambda _key, path, _value: device.unset_property(test_cfg.interface_device_prop, path),
+        test_cfg.sensor_paths,
+    )
 
     cprint("\nChecking data stored on the server.", color="cyan", flush=True)
-    json_res = get_server_interface(test_cfg, test_cfg.interface_device_prop)
+    json_res = wait_server_interface(
+        test_cfg, test_cfg.interface_device_prop, lambda data: data == {}
+    )
     parsed_res = json_res.get("data", {})
 
     # Check received and sent data match
@@ -80,7 +89,7 @@ def test_properties_from_device_to_server(device: Device, test_cfg: TestCfg):
         raise ValueError("Incorrect data stored on server")
 
 
-def test_properties_from_server_to_device(test_cfg: TestCfg, rx_data_lock: Lock, rx_data: dict):
+def test_properties_from_server_to_device(test_cfg: TestCfg, rx_data: RxData):
     """
     Test for individual properties in the direction from server to device
     """
@@ -93,53 +102,49 @@ def test_properties_from_server_to_device(test_cfg: TestCfg, rx_data_lock: Lock,
         flush=True,
     )
 
-    for key, value in test_cfg.mock_data.items():
+    expected = {test_cfg.sensor_paths[k]: v for k, v in test_cfg.mock_data.items()}
+    expected_unset = {test_cfg.sensor_paths[k]: None for k in test_cfg.mock_data}
+
+    def _post(key, path, value):
         value = prepare_transmit_data(key, value)
-        post_server_interface(test_cfg, test_cfg.interface_server_prop, "/sensor_id/" + key, value)
-        time.sleep(0.005)
+        post_server_interface(test_cfg, test_cfg.interface_server_prop, path, value)
 
-    time.sleep(1)
+    def _delete(_key, path, _value):
+        delete_server_interface(test_cfg, test_cfg.interface_server_prop, path)
+
+    # The requests are independent, send them concurrently over the shared session
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        drive_mock_data(test_cfg, _post, test_cfg.sensor_paths, executor=executor)
 
     cprint("\nChecking data received by the device.", color="cyan", flush=True)
+    rx_data.wait_for(test_cfg.interface_server_prop, lambda data: data == expected)
 
-    with rx_data_lock:
-        if not rx_data.get(test_cfg.interface_server_prop):
-            raise ValueError(
-                f"No data from this interface has been received {test_cfg.interface_server_prop}"
-            )
-        parsed_rx_data = rx_data.get(test_cfg.interface_server_prop)
-
-    if parsed_rx_data != {("/sensor_id/" + k): v for (k, v) in test_cfg.mock_data.items()}:
-        cprint(
-            "Expected: " + str({("/sensor_id/" + k): v for (k, v) in test_cfg.mock_data.items()}),
-            "red",
-            flush=True,
+    parsed_rx_data = rx_data.get(test_cfg.interface_server_prop)
+    if not parsed_rx_data:
+        raise ValueError(
+            f"No data from this interface has been received {test_cfg.interface_server_prop}"
         )
+
+    if parsed_rx_data != expected:
+        cprint("Expected: " + str(expected), "red", flush=True)
         cprint("Received: " + str(parsed_rx_data), "red", flush=True)
         raise ValueError("Incorrectly formatted response from server")
 
     # Unset all the properties
     cprint("\nUnset all the server owned properties.", color="cyan", flush=True)
-    for key, _ in test_cfg.mock_data.items():
-        delete_server_interface(test_cfg, test_cfg.interface_server_prop, "/sensor_id/" + key)
-        time.sleep(0.005)
-
-    time.sleep(1)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        drive_mock_data(test_cfg, _delete, test_cfg.sensor_paths, executor=executor)
 
     cprint("\nChecking data received by the device.", color="cyan", flush=True)
+    rx_data.wait_for(test_cfg.interface_server_prop, lambda data: data == expected_unset)
 
-    with rx_data_lock:
-        if not rx_data.get(test_cfg.interface_server_prop):
-            raise ValueError(
-                f"No data from this interface has been received {test_cfg.interface_server_prop}"
-            )
-        parsed_rx_data = rx_data.get(test_cfg.interface_server_prop)
-
-    if parsed_rx_data != {"/sensor_id/" + k: None for k in test_cfg.mock_data}:
-        cprint(
-            "Expected: " + str({"/sensor_id/" + k: None for k in test_cfg.mock_data}),
-            "red",
-            flush=True,
+    parsed_rx_data = rx_data.get(test_cfg.interface_server_prop)
+    if not parsed_rx_data:
+        raise ValueError(
+            f"No data from this interface has been received {test_cfg.interface_server_prop}"
         )
+
+    if parsed_rx_data != expected_unset:
+        cprint("Expected: " + str(expected_unset), "red", flush=True)
         cprint("Received: " + str(parsed_rx_data), "red", flush=True)
         raise ValueError("Incorrectly formatted response from server")
@@ -0,0 +1,45 @@
+# This file is part of Astarte.
+#
+# Copyright 2024 SECO Mind Srl
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+"""
+Contains the event loop shared by the device callbacks of the end to end tests.
+"""
+from __future__ import annotations
+
+import asyncio
+import functools
+from threading import Thread
+
+
+def _run_loop(loop: asyncio.AbstractEventLoop) -> None:
+    """
+    Run an asyncio event loop, used for the device callbacks.
+    """
+    asyncio.set_event_loop(loop)
+    loop.run_forever()
+
+
+@functools.lru_cache(maxsize=None)
+def get_callback_loop() -> tuple[asyncio.AbstractEventLoop, Thread]:
+    """
+    Get the event loop used for the device callbacks and the daemon thread running it.
+    The loop is created and started on the first call, the following calls return the same one.
+    """
+    loop = asyncio.new_event_loop()
+    thread = Thread(target=_run_loop, args=[loop], daemon=True)
+    thread.start()
+    return loop, thread
@@ -19,9 +19,69 @@
 Contains common configuration for all tests.
 """
 
+import functools
 import os
 from datetime import datetime, timezone
 from pathlib import Path
+from types import MappingProxyType
+
+# Root folder of this project, the e2e tests resources are located relative to it
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+# Mock data shared by all the test configurations, selected by index
+_MOCK_DATA_OPTS = (
+    {
+        "double_endpoint": 5.4,
+        "integer_endpoint": 42,
+        "boolean_endpoint": True,
+        "longinteger_endpoint": 45543543534,
+        "string_endpoint": "hello",
+        "binaryblob_endpoint": b"binblob",
+        "datetime_endpoint": datetime(2022, 11, 22, 10, 11, 21, 0, tzinfo=timezone.utc),
+        "doublearray_endpoint": [22.2, 322.22, 12.3, 0.1],
+        "integerarray_endpoint": [22, 322, 0, 10],
+        "booleanarray_endpoint": [True, False, True, False],
+        "longintegerarray_endpoint": [45543543534, 10, 0, 45543543534],
+        "stringarray_endpoint": ["hello", " world"],
+        "binaryblobarray_endpoint": [b"bin", b"blob"],
+        "datetimearray_endpoint": [
+            datetime(2022, 11, 22, 10, 11, 21, 0, tzinfo=timezone.utc),
+            datetime(2022, 10, 21, 12, 5, 33, 0, tzinfo=timezone.utc),
+        ],
+    },
+    {
+        "double_endpoint": 0.0,
+        "integer_endpoint": 0,
+        "boolean_endpoint": False,
+        "longinteger_endpoint": 0,
+        "string_endpoint": "",
+        "binaryblob_endpoint": b"binblob",
+        "datetime_endpoint": datetime(2022, 11, 22, 10, 11, 21, 0, tzinfo=timezone.utc),
+        "doublearray_endpoint": [],
+        "integerarray_endpoint": [],
+        "booleanarray_endpoint": [],
+        "longintegerarray_endpoint": [],
+        "stringarray_endpoint": [],
+        "binaryblobarray_endpoint": [],
+        "datetimearray_endpoint": [],
+    },
+)
+
+
+@functools.lru_cache(maxsize=1)
+def _env():
+    """
+    Snapshot of the end to end tests environment variables, read once for all the configurations.
+    """
+    return MappingProxyType({k: v for k, v in os.environ.items() if k.startswith("E2E_")})
+
+
+def _missing_env(*names: str):
+    """
+    Get the names of the environment variables that are unset or empty.
+    """
+    env = _env()
+    return [name for name in names if not env.get(name)]
 
 
 class TestCfg:
@@ -32,28 +92,40 @@ class TestCfg:
     # pylint: disable=too-many-instance-attributes,too-few-public-methods
 
     def __init__(self, device_n: int, mock_data_n: int) -> None:
+        env = _env()
         # Generic settings
-        self.realm = os.environ.get("E2E_REALM")
-        self.device_id = os.environ.get(f"E2E_DEVICE_{device_n}_ID")
-        self.appengine_url = os.environ.get("E2E_APPENGINE_URL")
-        self.appengine_token = os.environ.get("E2E_APPENGINE_TOKEN")
+        self.realm = env.get("E2E_REALM")
+        self.device_id = env.get(f"E2E_DEVICE_{device_n}_ID")
+        self.appengine_url = env.get("E2E_APPENGINE_URL")
+        self.appengine_token = env.get("E2E_APPENGINE_TOKEN")
         # MQTT specific settings
-        self.credentials_secret = os.environ.get(f"E2E_CREDENTIALS_SECRET_{device_n}")
-        self.pairing_url = os.environ.get("E2E_PAIRING_URL")
+        self.credentials_secret = env.get(f"E2E_CREDENTIALS_SECRET_{device_n}")
+        self.pairing_url = env.get("E2E_PAIRING_URL")
         # GRPC specific settings
-        self.grpc_socket_port = os.environ.get("E2E_GRPC_SOCKET_PORT")
-        self.grpc_node_uuid = os.environ.get("E2E_GRPC_NODE_UUID")
-
-        if not (
-            all([self.realm, self.device_id, self.appengine_url, self.appengine_token])
-            and (
-                all([self.pairing_url, self.credentials_secret])
-                or all([self.grpc_socket_port, self.grpc_node_uuid])
+        self.grpc_socket_port = env.get("E2E_GRPC_SOCKET_PORT")
+        self.grpc_node_uuid = env.get("E2E_GRPC_NODE_UUID")
+
+        missing = _missing_env(
+            "E2E_REALM", f"E2E_DEVICE_{device_n}_ID", "E2E_APPENGINE_URL", "E2E_APPENGINE_TOKEN"
+        )
+        # Either the MQTT or the GRPC settings should be present
+        missing_mqtt = _missing_env(f"E2E_CREDENTIALS_SECRET_{device_n}", "E2E_PAIRING_URL")
+        missing_grpc = _missing_env("E2E_GRPC_SOCKET_PORT", "E2E_GRPC_NODE_UUID")
+        if missing_mqtt and missing_grpc:
+            missing.append(
+                f"{' and '.join(missing_mqtt)} (MQTT) or {' and '.join(missing_grpc)} (GRPC)"
             )
-        ):
-            raise ValueError("Missing one of the environment variables")
+        if missing:
+            raise ValueError(f"Missing environment variables: {', '.join(missing)}")
+
+        # Precomputed values for the HTTP requests to AppEngine
+        self.device_base_url = "".join(
+            (self.appengine_url, "/v1/", self.realm, "/devices/", self.device_id, "/interfaces/")
+        )
+        self.auth_headers = {"Authorization": "Bearer " + self.appengine_token}
+        self.json_headers = {**self.auth_headers, "Content-Type": "application/json"}
 
-        self.interfaces_fld = Path.joinpath(Path.cwd(), "e2etest", "interfaces")
+        self.interfaces_fld = PROJECT_ROOT / "e2etest" / "interfaces"
 
         self.interface_server_data = "org.astarte-platform.python.e2etest.ServerDatastream"
         self.interface_device_data = "org.astarte-platform.python.e2etest.DeviceDatastream"
@@ -62,42 +134,9 @@ class TestCfg:
         self.interface_server_prop = "org.astarte-platform.python.e2etest.ServerProperty"
         self.interface_device_prop = "org.astarte-platform.python.e2etest.DeviceProperty"
 
-        mock_data_opts = [
-            {
-                "double_endpoint": 5.4,
-                "integer_endpoint": 42,
-                "boolean_endpoint": True,
-                "longinteger_endpoint": 45543543534,
-                "string_endpoint": "hello",
-                "binaryblob_endpoint": b"binblob",
-                "datetime_endpoint": datetime(2022, 11, 22, 10, 11, 21, 0, tzinfo=timezone.utc),
-                "doublearray_endpoint": [22.2, 322.22, 12.3, 0.1],
-                "integerarray_endpoint": [22, 322, 0, 10],
-                "booleanarray_endpoint": [True, False, True, False],
-                "longintegerarray_endpoint": [45543543534, 10, 0, 45543543534],
-                "stringarray_endpoint": ["hello", " world"],
-                "binaryblobarray_endpoint": [b"bin", b"blob"],
-                "datetimearray_endpoint": [
-                    datetime(2022, 11, 22, 10, 11, 21, 0, tzinfo=timezone.utc),
-                    datetime(2022, 10, 21, 12, 5, 33, 0, tzinfo=timezone.utc),
-                ],
-            },
-            {
-                "double_endpoint": 0.0,
-                "integer_endpoint": 0,
-                "boolean_endpoint": False,
-                "longinteger_endpoint": 0,
-                "string_endpoint": "",
-                "binaryblob_endpoint": b"binblob",
-                "datetime_endpoint": datetime(2022, 11, 22, 10, 11, 21, 0, tzinfo=timezone.utc),
-                "doublearray_endpoint": [],
-                "integerarray_endpoint": [],
-                "booleanarray_endpoint": [],
-                "longintegerarray_endpoint": [],
-                "stringarray_endpoint": [],
-                "binaryblobarray_endpoint": [],
-                "datetimearray_endpoint": [],
-            },
-        ]
-
-        self.mock_data = mock_data_opts[mock_data_n - 1]
+        # Read only view, the mock data is shared by all the configurations
+        self.mock_data = MappingProxyType(_MOCK_DATA_OPTS[mock_data_n - 1])
+        self.mock_data_keys = frozenset(self.mock_data)
+        # Paths of the mock data endpoints, for the individual and the object interfaces
+        self.data_paths = {k: "/" + k for k in self.mock_data}
+        self.sensor_paths = {k: "/sensor_id/" + k for k in self.mock_data}
@@ -0,0 +1,95 @@
+# This file is part of Astarte.
+#
+# Copyright 2024 SECO Mind Srl
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+"""
+Contains helpers to inspect the database of the device under test.
+"""
+
+from __future__ import annotations
+
+import atexit
+import pickle
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+
+# Only the columns unpacked by peek_database are fetched
+_SELECT_PROPERTIES = "SELECT interface, major, path, value FROM properties"
+
+# Connections to the devices databases, opened once for each database and kept read only
+# outside of database_transaction
+_connections: dict[Path, sqlite3.Connection] = {}
+
+
+def _get_connection(database_path: Path) -> sqlite3.Connection:
+    connection = _connections.get(database_path)
+    if connection is None:
+        connection = sqlite3.connect(database_path, check_same_thread=False, isolation_level=None)
+        connection.executescript(
+            "PRAGMA query_only=1; PRAGMA cache_size=-8192; PRAGMA temp_store=MEMORY;"
+        )
+        _connections[database_path] = connection
+    return connection
+
+
+@atexit.register
+def _close_connections() -> None:
+    for connection in _connections.values():
+        connection.close()
+    _connections.clear()
+
+
+def _database_path(persistency_dir: Path, device_id: str) -> Path:
+    return persistency_dir.joinpath(device_id, "caching", "astarte.db")
+
+
+@contextmanager
+def database_transaction(persistency_dir: Path, device_id: str):
+    """
+    Modify the device database in a single transaction, using the shared connection.
+    The transaction is committed on exit and rolled back if an exception is raised.
+    """
+    connection = _get_connection(_database_path(persistency_dir, device_id))
+    connection.execute("PRAGMA query_only=0")
+    try:
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+    finally:
+        connection.execute("PRAGMA query_only=1")
+
+
+def peek_database(persistency_dir: Path, device_id: str, *interface_names: str):
+    """
+    Take a peek in the device database, optionally filtering the properties of some interfaces.
+    """
+    connection = _get_connection(_database_path(persistency_dir, device_id))
+    if not interface_names:
+        cursor = connection.execute(_SELECT_PROPERTIES)
+    else:
+        placeholders = ",".join("?" * len(interface_names))
+        cursor = connection.execute(
+            f"{_SELECT_PROPERTIES} WHERE interface IN ({placeholders})", interface_names
+        )
+    # Iterate the cursor directly, rows are decoded as they are fetched
+    return [
+        (interface, major, path, pickle.loads(value)) for interface, major, path, value in cursor
+    ]
@@ -18,37 +18,74 @@
 """
 Contains useful wrappers for HTTPS requests.
 """
+import atexit
 import base64
-import json
+import logging
+import os
+import socket
+import time
+from binascii import a2b_base64
+from datetime import datetime
 
+import orjson
 import requests
-from config import TestCfg
 from dateutil import parser
+from requests.adapters import HTTPAdapter
 from termcolor import cprint
+from urllib3.connection import HTTPConnection
+from urllib3.util.retry import Retry
+
+from e2etest.common.config import TestCfg
+
+# Logging of each HTTP request, enabled by setting E2E_HTTP_DEBUG=1
+_LOG = logging.getLogger(__name__)
+if os.environ.get("E2E_HTTP_DEBUG") == "1":
+    _LOG.addHandler(logging.StreamHandler())
+    _LOG.setLevel(logging.DEBUG)
+
+
+class _KeepAliveAdapter(HTTPAdapter):
+    """
+    HTTP adapter enabling TCP keepalive on the pooled sockets, on top of the urllib3 defaults
+    (which already disable Nagle's algorithm with TCP_NODELAY).
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["socket_options"] = HTTPConnection.default_socket_options + [
+            (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        ]
+        super().init_poolmanager(*args, **kwargs)
+
+
+# Shared session, keeps the connections to AppEngine alive across requests
+_SESSION = requests.Session()
+_ADAPTER = _KeepAliveAdapter(
+    pool_connections=8,
+    pool_maxsize=32,
+    max_retries=Retry(
+        total=2, backoff_factor=0.1, status_forcelist=[502, 503, 504], raise_on_status=False
+    ),
+)
+_SESSION.mount("http://", _ADAPTER)
+_SESSION.mount("https://", _ADAPTER)
+# Close the pooled connections once the test script is done with them
+atexit.register(_SESSION.close)
 
 
 def get_server_interface(test_cfg: TestCfg, interface: str, quiet: bool = False):
     """
     Wrapper for a GET request for the server returning the specified interface data.
     """
-    request_body = (
-        test_cfg.appengine_url
-        + "/v1/"
-        + test_cfg.realm
-        + "/devices/"
-        + test_cfg.device_id
-        + "/interfaces/"
-        + interface
-    )
-    headers = {"Authorization": "Bearer " + test_cfg.appengine_token}
-    print(f"Sending HTTP GET request: {request_body}", flush=True)
-    res = requests.get(request_body, headers=headers, timeout=1)
+    request_body = f"{test_cfg.device_base_url}{interface}"
+    headers = test_cfg.auth_headers
+    _LOG.debug("Sending HTTP GET request: %s", request_body)
+    res = _SESSION.get(request_body, headers=headers, timeout=1)
     if res.status_code != 200:
         if not quiet:
             cprint(res.text, "red", flush=True)
         raise requests.HTTPError("GET request failed.")
 
-    return res.json()
+    return orjson.loads(res.content)
 
 
 def post_server_interface(
@@ -57,23 +94,11 @@ def post_server_interface(
     """
     Wrapper for a POST request for the server, uploading new values to an interface.
     """
-    request_body = (
-        test_cfg.appengine_url
-        + "/v1/"
-        + test_cfg.realm
-        + "/devices/"
-        + test_cfg.device_id
-        + "/interfaces/"
-        + interface
-        + endpoint
-    )
-    json_data = json.dumps({"data": data}, default=str)
-    headers = {
-        "Authorization": "Bearer " + test_cfg.appengine_token,
-        "Content-Type": "application/json",
-    }
-    print(f"Sending HTTP POST request: {request_body} {json_data}", flush=True)
-    res = requests.post(url=request_body, data=json_data, headers=headers, timeout=1)
+    request_body = f"{test_cfg.device_base_url}{interface}{endpoint}"
+    json_data = orjson.dumps({"data": data}, default=str, option=orjson.OPT_NAIVE_UTC)
+    headers = test_cfg.json_headers
+    _LOG.debug("Sending HTTP POST request: %s %s", request_body, json_data)
+    res = _SESSION.post(url=request_body, data=json_data, headers=headers, timeout=1)
     if res.status_code != 200:
         if not quiet:
             cprint(res.text, "red", flush=True)
@@ -84,37 +109,130 @@ def delete_server_interface(test_cfg: TestCfg, interface: str, endpoint: str, qu
     """
     Wrapper for a DELETE request for the server, deleting an endpoint.
     """
-    request_body = (
-        test_cfg.appengine_url
-        + "/v1/"
-        + test_cfg.realm
-        + "/devices/"
-        + test_cfg.device_id
-        + "/interfaces/"
-        + interface
-        + endpoint
-    )
-    headers = {
-        "Authorization": "Bearer " + test_cfg.appengine_token,
-        "Content-Type": "application/json",
-    }
-    print(f"Sending HTTP DELETE request: {request_body}", flush=True)
-    res = requests.delete(request_body, headers=headers, timeout=1)
+    request_body = f"{test_cfg.device_base_url}{interface}{endpoint}"
+    headers = test_cfg.json_headers
+    _LOG.debug("Sending HTTP DELETE request: %s", request_body)
+    res = _SESSION.delete(request_body, headers=headers, timeout=1)
     if res.status_code != 204:
         if not quiet:
             cprint(res.text, "red", flush=True)
         raise requests.HTTPError("DELETE request failed.")
 
 
+def wait_server_interface(
+    test_cfg: TestCfg, interface: str, predicate, timeout: float = 5.0, interval: float = 0.05
+):
+    """
+    Poll the server for the specified interface data until the predicate is satisfied or the
+    timeout expires. Returns the last data received from the server.
+    A failed request or a predicate failing to parse partially propagated data is polled again,
+    if no poll succeeded before the timeout the last error is raised.
+    """
+    json_res = None
+    last_error = None
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            res = get_server_interface(test_cfg, interface, quiet=True)
+            satisfied = predicate(res.get("data", {}))
+        except (requests.HTTPError, KeyError, ValueError) as exc:
+            last_error = exc
+        else:
+            json_res = res
+            if satisfied:
+                return json_res
+        if time.monotonic() > deadline:
+            if json_res is None:
+                raise last_error
+            return json_res
+        time.sleep(interval)
+
+
+def wait_server_interface_removed(
+    test_cfg: TestCfg, interface: str, timeout: float = 5.0, interval: float = 0.05
+):
+    """
+    Poll the server until the specified interface data is no longer available or the timeout
+    expires. Returns True if the interface has been removed from the server.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            get_server_interface(test_cfg, interface, quiet=True)
+        except requests.HTTPError:
+            return True
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(interval)
+
+
+def _encode_blob(value: bytes) -> str:
+    return base64.b64encode(value).decode("ascii")
+
+
+def _encode_blob_array(value: list) -> list:
+    return [_encode_blob(v) for v in value]
+
+
+# Encoders for the data to be transmitted, indexed by endpoint
+_TRANSMIT_ENCODERS = {
+    "binaryblob_endpoint": _encode_blob,
+    "binaryblobarray_endpoint": _encode_blob_array,
+}
+
+
 def prepare_transmit_data(key, value):
     """
     Some data to be transmitted should be encoded to an appropriate type.
     """
-    if key == "binaryblob_endpoint":
-        return base64.b64encode(value).decode("utf-8")
-    if key == "binaryblobarray_endpoint":
-        return [base64.b64encode(v).decode("utf-8") for v in value]
-    return value
+    encoder = _TRANSMIT_ENCODERS.get(key)
+    return encoder(value) if encoder else value
+
+
+def _parse_iso(timestamp: str) -> datetime:
+    """
+    Parse an ISO 8601 timestamp using the C implementation of the standard library, falling back
+    to the dateutil ISO parser for formats it does not support.
+    """
+    try:
+        return datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    except ValueError:
+        return parser.isoparse(timestamp)
+
+
+def _parse_longinteger_array(value: list) -> list:
+    return list(map(int, value))
+
+
+def _parse_datetime_array(value: list) -> list:
+    return [_parse_iso(dt) for dt in value]
+
+
+def _parse_binaryblob_array(value: list) -> list:
+    return list(map(a2b_base64, value))
+
+
+# Parsers for the received data, indexed by endpoint:
+# - longinteger from string to number (only necessary for aggregates)
+# - datetime from string to datetime
+# - binary blob decoded from base64
+_PARSE_HANDLERS = {
+    "longinteger_endpoint": int,
+    "longintegerarray_endpoint": _parse_longinteger_array,
+    "datetime_endpoint": _parse_iso,
+    "datetimearray_endpoint": _parse_datetime_array,
+    "binaryblob_endpoint": a2b_base64,
+    "binaryblobarray_endpoint": _parse_binaryblob_array,
+}
+
+
+def _blank_arrays(data):
+    """
+    Unset arrays are returned by the server as None, parse them to an empty list.
+    """
+    for key, value in data.items():
+        if value is None and key.endswith("array_endpoint"):
+            data[key] = []
 
 
 def parse_received_data(data):
@@ -122,27 +240,8 @@ def parse_received_data(data):
     Some of the received data is not automatically parsed as Python types.
     Specifically, datetime and binaryblob should be converted manually from strings.
     """
-    # Parse all None values to an empty list
-    for key, value in data.items():
-        if (key.endswith("array_endpoint")) and (value == None):
-            data[key] = []
+    _blank_arrays(data)
 
-    # Parse longinteger from string to number (only necessary for aggregates)
-    if "longinteger_endpoint" in data:
-        data["longinteger_endpoint"] = int(data["longinteger_endpoint"])
-    if "longintegerarray_endpoint" in data:
-        data["longintegerarray_endpoint"] = [int(dt) for dt in data["longintegerarray_endpoint"]]
-
-    # Parse datetime from string to datetime
-    if "datetime_endpoint" in data:
-        data["datetime_endpoint"] = parser.parse(data["datetime_endpoint"])
-    if "datetimearray_endpoint" in data:
-        data["datetimearray_endpoint"] = [parser.parse(dt) for dt in data["datetimearray_endpoint"]]
-
-    # Decode binary blob from base64
-    if "binaryblob_endpoint" in data:
-        data["binaryblob_endpoint"] = base64.b64decode(data["binaryblob_endpoint"])
-    if "binaryblobarray_endpoint" in data:
-        data["binaryblobarray_endpoint"] = [
-            base64.b64decode(dt) for dt in data["binaryblobarray_endpoint"]
-        ]
+    for key, handler in _PARSE_HANDLERS.items():
+        if key in data:
+            data[key] = handler(data[key])
@@ -0,0 +1,66 @@
+# This file is part of Astarte.
+#
+# Copyright 2024 SECO Mind Srl
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+"""
+Contains a thread safe storage for the data received by the device.
+"""
+
+from threading import Condition
+
+
+class RxData:
+    """
+    Data received by the device, grouped by interface and path.
+
+    Waiters are notified each time new data is stored, so tests can wait for the expected data
+    without sleeping a fixed amount of time.
+
+    The stored data is copied on write: each store publishes new dictionaries, which are never
+    modified afterwards, so readers can take a snapshot without acquiring the lock.
+    """
+
+    def __init__(self) -> None:
+        self._cond = Condition()
+        self._data = {}
+
+    def store(self, interface: str, path: str, payload) -> None:
+        """
+        Store some data received for an interface and notify the waiters.
+        """
+        with self._cond:
+            interface_data = dict(self._data.get(interface, {}))
+            interface_data[path] = payload
+            # Publish the new snapshot with a single reference assignment
+            self._data = {**self._data, interface: interface_data}
+            self._cond.notify_all()
+
+    def get(self, interface: str):
+        """
+        Get a copy of the data received for an interface, None if no data has been received.
+        """
+        data = self._data.get(interface)
+        return dict(data) if data is not None else None
+
+    def wait_for(self, interface: str, predicate, timeout: float = 5.0) -> bool:
+        """
+        Wait until the data received for an interface satisfies the predicate or the timeout
+        expires. Returns the last value of the predicate.
+        """
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: predicate(self._data.get(interface, {})), timeout=timeout
+            )
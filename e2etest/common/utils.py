@@ -0,0 +1,47 @@
+# This file is part of Astarte.
+#
+# Copyright 2024 SECO Mind Srl
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+"""
+Contains generic helpers for the end to end tests.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from concurrent.futures import Executor
+
+from e2etest.common.config import TestCfg
+
+
+def drive_mock_data(
+    test_cfg: TestCfg,
+    op: Callable[[str, str, object], None],
+    paths: dict[str, str],
+    skip: frozenset[str] = frozenset(),
+    executor: Executor | None = None,
+):
+    """
+    Call op(key, path, value) for each mock data endpoint not in skip, with the path taken from
+    paths. The calls are performed in order, or concurrently if an executor is provided.
+    """
+    items = [(k, paths[k], v) for k, v in test_cfg.mock_data.items() if k not in skip]
+    if executor is None:
+        for item in items:
+            op(*item)
+    else:
+        for future in [executor.submit(op, *item) for item in items]:
+            future.result()
@@ -21,118 +21,119 @@ Specifically designed to test persistency.
 """
 import argparse
 import asyncio
-import importlib.util
+import atexit
 import os
 import pickle
-import sqlite3
 import sys
+import tempfile
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from threading import Lock, Thread
+from threading import Event
 
 from termcolor import cprint
 
-# Assuming this script is called from the root folder of this project.
-prj_path = Path(os.getcwd())
+# Make the project packages importable independently from the working directory.
+prj_path = Path(__file__).resolve().parents[2]
 if str(prj_path) not in sys.path:
     sys.path.insert(0, str(prj_path))
 
 from astarte.device import DeviceMqtt
-
-config_path = Path.joinpath(Path.cwd(), "e2etest", "common", "config.py")
-spec = importlib.util.spec_from_file_location("config", config_path)
-config = importlib.util.module_from_spec(spec)
-sys.modules["config"] = config
-spec.loader.exec_module(config)
-
-http_requests_path = Path.joinpath(Path.cwd(), "e2etest", "common", "http_requests.py")
-spec = importlib.util.spec_from_file_location("http_requests", http_requests_path)
-http_requests = importlib.util.module_from_spec(spec)
-sys.modules["http_requests"] = http_requests
-spec.loader.exec_module(http_requests)
-
-from config import TestCfg
-from http_requests import (
+from e2etest.common.callback_loop import get_callback_loop
+from e2etest.common.config import TestCfg
+from e2etest.common.database import database_transaction, peek_database
+from e2etest.common.http_requests import (
     delete_server_interface,
     get_server_interface,
     parse_received_data,
     post_server_interface,
     prepare_transmit_data,
 )
+from e2etest.common.utils import drive_mock_data
 
-rx_data_lock = Lock()
 rx_data = {}
+connected = Event()
+disconnected = Event()
+# Used to read the server and device owned properties from Astarte concurrently
+astarte_executor = ThreadPoolExecutor(max_workers=2)
+atexit.register(astarte_executor.shutdown)
+# Properties left set by unset_some_properties, for the device and server owned interfaces
+_KEPT_DEVICE_PROPS = frozenset({"datetime_endpoint", "booleanarray_endpoint"})
+_KEPT_SERVER_PROPS = frozenset({"longinteger_endpoint", "stringarray_endpoint"})
 
 
 def on_connected_cbk(_):
     """
     Callback for a connection event.
     """
-    cprint("\nDevice connected.", color="green", flush=True)
+    cprint("\nDevice connected.", color="green")
+    disconnected.clear()
+    connected.set()
 
 
 def on_data_received_cbk(_, name: str, path: str, payload: dict):
     """
     Callback for a data reception event.
     """
-    with rx_data_lock:
-        if not rx_data.get(name):
-            rx_data[name] = {}
-        rx_data[name][path] = payload
+    # Only written from the callbacks loop, setdefault is atomic under the GIL
+    rx_data.setdefault(name, {})[path] = payload
 
 
 def on_disconnected_cbk(_, reason: int):
     """
     Callback for a disconnection event.
     """
-    cprint(f"\nDevice disconnected because: {reason}.", color="red", flush=True)
+    cprint(f"\nDevice disconnected because: {reason}.", color="red")
+    connected.clear()
+    disconnected.set()
 
 
 def set_all_properties(device: DeviceMqtt, test_cfg: TestCfg):
     """
     Set all the device and server owned properties.
     """
-    cprint("\nSet device owned properties.", color="cyan", flush=True)
-    for key, value in test_cfg.mock_data.items():
-        device.send(test_cfg.interface_device_prop, "/sensor_id/" + key, value)
-        time.sleep(0.005)
+    cprint("\nSet device owned properties.", color="cyan")
+    drive_mock_data(
+        test_cfg,
+        lambda _key, path, value: device.send(test_cfg.interface_device_prop, path, value),
+        test_cfg.sensor_paths,
+    )
 
-    cprint("\nSet server owned properties.", color="cyan", flush=True)
-    for key, value in test_cfg.mock_data.items():
-        value = prepare_transmit_data(key, value)
-        post_server_interface(test_cfg, test_cfg.interface_server_prop, "/sensor_id/" + key, value)
-        time.sleep(0.005)
+    # The server owned properties are sent in order, as they are stored by the device
+    cprint("\nSet server owned properties.", color="cyan")
+    drive_mock_data(
+        test_cfg,
+        lambda key, path, value: post_server_interface(
+            test_cfg, test_cfg.interface_server_prop, path, prepare_transmit_data(key, value)
+        ),
+        test_cfg.sensor_paths,
+    )
 
 
 def unset_some_properties(device: DeviceMqtt, test_cfg: TestCfg):
     """
     Unset some of the device and server owned properties.
     """
-    cprint("\nUnset some device owned properties.", color="cyan", flush=True)
-    for key, _ in test_cfg.mock_data.items():
-        if key not in ["datetime_endpoint", "booleanarray_endpoint"]:
-            device.unset_property(test_cfg.interface_device_prop, "/sensor_id/" + key)
-            time.sleep(0.005)
-
-    cprint("\nUnset some server owned properties.", color="cyan", flush=True)
-    for key, _ in test_cfg.mock_data.items():
-        if key not in ["longinteger_endpoint", "stringarray_endpoint"]:
-            delete_server_interface(test_cfg, test_cfg.interface_server_prop, "/sensor_id/" + key)
-        time.sleep(0.005)
-
-
-def peek_database(persistency_dir: Path, device_id: str):
-    """
-    Take a peek in the device database.
-    """
-    database_path = persistency_dir.joinpath(device_id, "caching", "astarte.db")
-    properties = (
-        sqlite3.connect(database_path).cursor().execute("SELECT * FROM properties").fetchall()
+    cprint("\nUnset some device owned properties.", color="cyan")
+    drive_mock_data(
+        test_cfg,
+        lambda _key, path, _value: device.unset_property(test_cfg.interface_device_prop, path),
+        test_cfg.sensor_paths,
+        skip=_KEPT_DEVICE_PROPS,
     )
-    parsed_properties = []
-    for interface, major, path, value in properties:
-        parsed_properties += [(interface, major, path, pickle.loads(value))]
-    return parsed_properties
+
+    # Deletions are independent from each other, send them concurrently
+    cprint("\nUnset some server owned properties.", color="cyan")
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        drive_mock_data(
+            test_cfg,
+            lambda _key, path, _value: delete_server_interface(
+                test_cfg, test_cfg.interface_server_prop, path
+            ),
+            test_cfg.sensor_paths,
+            skip=_KEPT_SERVER_PROPS,
+            executor=executor,
+        )
 
 
 def shuffle_database(persistency_dir: Path, test_cfg: TestCfg):
@@ -140,26 +141,35 @@ def shuffle_database(persistency_dir: Path, test_cfg: TestCfg):
     Add and remove some properties from the database to create some differences with the
     Astarte instance.
     """
-    database_path = persistency_dir.joinpath(test_cfg.device_id, "caching", "astarte.db")
-    connection = sqlite3.connect(database_path)
-    cursor = connection.cursor()
-    cursor.execute(
-        "DELETE FROM properties WHERE interface=? AND path=?",
-        (test_cfg.interface_device_prop, "/sensor_id/datetime_endpoint"),
-    )
-    cursor.execute(
-        "DELETE FROM properties WHERE interface=? AND path=?",
-        (test_cfg.interface_server_prop, "/sensor_id/longinteger_endpoint"),
-    )
-    cursor.execute(
-        "INSERT OR REPLACE INTO properties (interface, major, path, value) VALUES " "(?, ?, ?, ?)",
-        (test_cfg.interface_device_prop, 0, "/sensor_id/integer_endpoint", pickle.dumps(66)),
-    )
-    cursor.execute(
-        "INSERT OR REPLACE INTO properties (interface, major, path, value) VALUES " "(?, ?, ?, ?)",
-        (test_cfg.interface_server_prop, 0, "/sensor_id/boolean_endpoint", pickle.dumps(True)),
-    )
-    connection.commit()
+    # All the changes are applied in a single transaction, with a single sync to disk
+    with database_transaction(persistency_dir, test_cfg.device_id) as connection:
+        # Row values require SQLite 3.15 or later
+        connection.execute(
+            "DELETE FROM properties WHERE (interface, path) IN (VALUES (?, ?), (?, ?))",
+            (
+                test_cfg.interface_device_prop,
+                "/sensor_id/datetime_endpoint",
+                test_cfg.interface_server_prop,
+                "/sensor_id/longinteger_endpoint",
+            ),
+        )
+        connection.executemany(
+            "INSERT OR REPLACE INTO properties (interface, major, path, value) VALUES (?, ?, ?, ?)",
+            [
+                (
+                    test_cfg.interface_device_prop,
+                    0,
+                    "/sensor_id/integer_endpoint",
+                    pickle.dumps(66, protocol=pickle.HIGHEST_PROTOCOL),
+                ),
+                (
+                    test_cfg.interface_server_prop,
+                    0,
+                    "/sensor_id/boolean_endpoint",
+                    pickle.dumps(True, protocol=pickle.HIGHEST_PROTOCOL),
+                ),
+            ],
+        )
 
 
 def peek_astarte(test_cfg: TestCfg):
@@ -167,24 +177,83 @@ def peek_astarte(test_cfg: TestCfg):
     Get the set properties in the Astarte cluster.
     """
     server_data = {}
-    cprint("\nReading data stored on the server.", color="cyan", flush=True)
-    json_res = get_server_interface(test_cfg, test_cfg.interface_device_prop)
-    server_data[test_cfg.interface_device_prop] = json_res.get("data", {}).get("sensor_id", {})
-    parse_received_data(server_data[test_cfg.interface_device_prop])
-
-    json_res = get_server_interface(test_cfg, test_cfg.interface_server_prop)
-    server_data[test_cfg.interface_server_prop] = json_res.get("data", {}).get("sensor_id", {})
-    parse_received_data(server_data[test_cfg.interface_server_prop])
+    cprint("\nReading data stored on the server.", color="cyan")
+    interfaces = [test_cfg.interface_device_prop, test_cfg.interface_server_prop]
+    futures = [astarte_executor.submit(get_server_interface, test_cfg, i) for i in interfaces]
+    for interface, future in zip(interfaces, futures):
+        server_data[interface] = future.result().get("data", {}).get("sensor_id", {})
+        parse_received_data(server_data[interface])
     return server_data
 
 
-def main(cb_loop: asyncio.AbstractEventLoop, test_cfg: TestCfg):
+def _index_rows(rows: list):
+    """
+    Index the database rows by interface and path, so comparisons do not depend on the rows order.
+    The rows themselves are not hashable, as the values can be lists.
+    """
+    return {(interface, path): (major, value) for interface, major, path, value in rows}
+
+
+def check_database(actual_db: list, expect_db: list):
+    """
+    Check the device database contains exactly the expected properties, in any order.
+    """
+    actual, expect = _index_rows(actual_db), _index_rows(expect_db)
+    if actual != expect:
+        diff = {k for k in actual.keys() | expect.keys() if actual.get(k) != expect.get(k)}
+        print(f"Mismatched properties: {sorted(diff)}", flush=True)
+        print(f"Expected database: {expect_db}", flush=True)
+        print(f"Actual database: {actual_db}", flush=True)
+    assert actual == expect
+
+
+def wait_database(persistency_dir: Path, test_cfg: TestCfg, expect_db: list, timeout: float = 5.0):
+    """
+    Wait until the device database contains the expected properties or the timeout expires.
+    Returns the last content of the database.
+    """
+    # Phase boundary, flush the progress messages buffered so far
+    sys.stdout.flush()
+    expect = _index_rows(expect_db)
+    deadline = time.monotonic() + timeout
+    while True:
+        actual_db = peek_database(persistency_dir, test_cfg.device_id)
+        if _index_rows(actual_db) == expect or time.monotonic() > deadline:
+            return actual_db
+        time.sleep(0.05)
+
+
+def wait_astarte(test_cfg: TestCfg, expect_astarte: dict, timeout: float = 5.0):
+    """
+    Wait until the Astarte cluster contains the expected properties or the timeout expires.
+    Returns the last properties read from Astarte.
+    Data that can not be parsed yet, as it is still propagating, is polled again. If no data
+    could be parsed before the timeout the last parse error is raised.
+    """
+    # Phase boundary, flush the progress messages buffered so far
+    sys.stdout.flush()
+    actual_astarte = None
+    last_error = None
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            actual_astarte = peek_astarte(test_cfg)
+        except (KeyError, ValueError) as exc:
+            last_error = exc
+        else:
+            if actual_astarte == expect_astarte:
+                return actual_astarte
+        if time.monotonic() > deadline:
+            if actual_astarte is None:
+                raise last_error
+            return actual_astarte
+        time.sleep(0.05)
+
+
+def main(cb_loop: asyncio.AbstractEventLoop, test_cfg: TestCfg, persistency_dir: Path):
     """
     Generate the device and run the end to end tests.
     """
-    persistency_dir = Path.joinpath(Path.cwd(), "e2etest", "persistency", "build")
-    if not Path.is_dir(persistency_dir):
-        os.makedirs(persistency_dir)
     device = DeviceMqtt(
         device_id=test_cfg.device_id,
         realm=test_cfg.realm,
@@ -202,9 +271,7 @@ def main(cb_loop: asyncio.AbstractEventLoop, test_cfg: TestCfg):
     )
     device.connect()
 
-    time.sleep(1)
-
-    if not device.is_connected():
+    if not connected.wait(timeout=5) or not device.is_connected():
         print("Connection failed.", flush=True)
         sys.exit(1)
 
@@ -214,57 +281,40 @@ def main(cb_loop: asyncio.AbstractEventLoop, test_cfg: TestCfg):
         test_cfg.interface_server_prop: {},
     }
 
+    # Expected content of the database and of Astarte, built once from the mock data
+    iface_dev, iface_srv = test_cfg.interface_device_prop, test_cfg.interface_server_prop
+    mock_items = tuple(test_cfg.mock_data.items())
+    full_db_device = [(iface_dev, 0, test_cfg.sensor_paths[k], v) for k, v in mock_items]
+    full_db_server = [(iface_srv, 0, test_cfg.sensor_paths[k], v) for k, v in mock_items]
+    # Single pass partition of the properties left set by unset_some_properties
+    kept_device, kept_server = {}, {}
+    for key, value in mock_items:
+        if key in _KEPT_DEVICE_PROPS:
+            kept_device[key] = value
+        elif key in _KEPT_SERVER_PROPS:
+            kept_server[key] = value
+
     # Set all the properties to check properties are stored correctly
     set_all_properties(device, test_cfg)
-    time.sleep(1)
 
-    actual_db = peek_database(persistency_dir, test_cfg.device_id)
-    expect_db = [
-        (test_cfg.interface_device_prop, 0, f"/sensor_id/{k}", v)
-        for k, v in test_cfg.mock_data.items()
-    ] + [
-        (test_cfg.interface_server_prop, 0, f"/sensor_id/{k}", v)
-        for k, v in test_cfg.mock_data.items()
-    ]
-    if actual_db != expect_db:
-        print(f"Expectec database: {expect_db}", flush=True)
-        print(f"Actual database: {actual_db}", flush=True)
-    assert actual_db == expect_db
-    assert all(data == test_cfg.mock_data for data in peek_astarte(test_cfg).values())
+    expect_db = full_db_device + full_db_server
+    check_database(wait_database(persistency_dir, test_cfg, expect_db), expect_db)
+    expect_astarte = {iface_dev: test_cfg.mock_data, iface_srv: test_cfg.mock_data}
+    assert wait_astarte(test_cfg, expect_astarte) == expect_astarte
 
     # Unset some properties to check properties are removed from the database correctly
     unset_some_properties(device, test_cfg)
-    time.sleep(1)
 
-    actual_db = peek_database(persistency_dir, test_cfg.device_id)
-    expect_db = [
-        (test_cfg.interface_device_prop, 0, f"/sensor_id/{k}", v)
-        for k, v in test_cfg.mock_data.items()
-        if k in ["datetime_endpoint", "booleanarray_endpoint"]
-    ] + [
-        (test_cfg.interface_server_prop, 0, f"/sensor_id/{k}", v)
-        for k, v in test_cfg.mock_data.items()
-        if k in ["longinteger_endpoint", "stringarray_endpoint"]
+    expect_db = [(iface_dev, 0, test_cfg.sensor_paths[k], v) for k, v in kept_device.items()] + [
+        (iface_srv, 0, test_cfg.sensor_paths[k], v) for k, v in kept_server.items()
     ]
-    if actual_db != expect_db:
-        print(f"Expectec database: {expect_db}", flush=True)
-        print(f"Actual database: {actual_db}", flush=True)
-    assert actual_db == expect_db
-    expect_astarte = {
-        test_cfg.interface_device_prop: {
-            "datetime_endpoint": test_cfg.mock_data["datetime_endpoint"],
-            "booleanarray_endpoint": test_cfg.mock_data["booleanarray_endpoint"],
-        },
-        test_cfg.interface_server_prop: {
-            "longinteger_endpoint": test_cfg.mock_data["longinteger_endpoint"],
-            "stringarray_endpoint": test_cfg.mock_data["stringarray_endpoint"],
-        },
-    }
-    assert all(v == expect_astarte[k] for k, v in peek_astarte(test_cfg).items())
+    check_database(wait_database(persistency_dir, test_cfg, expect_db), expect_db)
+    expect_astarte = {iface_dev: kept_device, iface_srv: kept_server}
+    assert wait_astarte(test_cfg, expect_astarte) == expect_astarte
 
     # Disconnect the device from Astarte
     device.disconnect()
-    time.sleep(1)
+    assert disconnected.wait(timeout=5)
 
     # Remove/Add some set server/device properties from the database manually
     shuffle_database(persistency_dir, test_cfg)
@@ -295,22 +345,13 @@ def main(cb_loop: asyncio.AbstractEventLoop, test_cfg: TestCfg):
             True,
         ),
     ]
-    assert peek_database(persistency_dir, test_cfg.device_id) == expect_db
-    expect_astarte = {
-        test_cfg.interface_device_prop: {
-            "datetime_endpoint": test_cfg.mock_data["datetime_endpoint"],
-            "booleanarray_endpoint": test_cfg.mock_data["booleanarray_endpoint"],
-        },
-        test_cfg.interface_server_prop: {
-            "longinteger_endpoint": test_cfg.mock_data["longinteger_endpoint"],
-            "stringarray_endpoint": test_cfg.mock_data["stringarray_endpoint"],
-        },
-    }
-    assert all(v == expect_astarte[k] for k, v in peek_astarte(test_cfg).items())
+    check_database(peek_database(persistency_dir, test_cfg.device_id), expect_db)
+    expect_astarte = {iface_dev: kept_device, iface_srv: kept_server}
+    assert peek_astarte(test_cfg) == expect_astarte
 
     # Connect to synchronize the database content with Astarte
     device.connect()
-    time.sleep(1)
+    assert connected.wait(timeout=5)
 
     expect_db = [
         (
@@ -338,26 +379,15 @@ def main(cb_loop: asyncio.AbstractEventLoop, test_cfg: TestCfg):
             ["hello", " world"],
         ),
     ]
-    assert peek_database(persistency_dir, test_cfg.device_id) == expect_db
+    check_database(wait_database(persistency_dir, test_cfg, expect_db), expect_db)
     expect_astarte = {
-        test_cfg.interface_device_prop: {
+        iface_dev: {
             "integer_endpoint": 66,
             "booleanarray_endpoint": test_cfg.mock_data["booleanarray_endpoint"],
         },
-        test_cfg.interface_server_prop: {
-            "longinteger_endpoint": test_cfg.mock_data["longinteger_endpoint"],
-            "stringarray_endpoint": test_cfg.mock_data["stringarray_endpoint"],
-        },
+        iface_srv: kept_server,
     }
-    assert all(v == expect_astarte[k] for k, v in peek_astarte(test_cfg).items())
-
-
-def start_call_back_loop(loop: asyncio.AbstractEventLoop) -> None:
-    """
-    Start an asyncio event loop, used for the device call back.
-    """
-    asyncio.set_event_loop(loop)
-    loop.run_forever()
+    assert wait_astarte(test_cfg, expect_astarte) == expect_astarte
 
 
 if __name__ == "__main__":
@@ -366,14 +396,19 @@ if __name__ == "__main__":
     parser.add_argument("--mock_data_n", default=1, type=int)
     args = parser.parse_args()
 
-    # Generate an async loop and thread
-    call_back_loop = asyncio.new_event_loop()
-    call_back_thread = Thread(target=start_call_back_loop, args=[call_back_loop], daemon=True)
-    call_back_thread.start()
-
-    try:
-        main(call_back_loop, TestCfg(device_n=args.device_n, mock_data_n=args.mock_data_n))
-    except Exception as e:
-        call_back_loop.stop()
-        call_back_thread.join(timeout=1)
-        raise e
+    # Get the async loop and thread shared by the device callbacks
+    call_back_loop, call_back_thread = get_callback_loop()
+
+    # Fresh persistency folder for each run, on a memory backed file system when available
+    tmp_root = "/dev/shm" if os.path.isdir("/dev/shm") else None
+    with tempfile.TemporaryDirectory(prefix="astarte-sdk-python-e2e-", dir=tmp_root) as tmp_dir:
+        try:
+            main(
+                call_back_loop,
+                TestCfg(device_n=args.device_n, mock_data_n=args.mock_data_n),
+                Path(tmp_dir),
+            )
+        except Exception as e:
+            call_back_loop.stop()
+            call_back_thread.join(timeout=1)
+            raise e
@@ -21,21 +21,18 @@ Specifically designed to test persistency.
 """
 import argparse
 import asyncio
-import importlib.util
 import os
-import pickle
-import sqlite3
 import sys
 import time
 from datetime import datetime, timezone
 from pathlib import Path
-from threading import Lock, Thread
+from threading import Event
 
 import requests
 from termcolor import cprint
 
-# Assuming this script is called from the root folder of this project.
-prj_path = Path(os.getcwd())
+# Make the project packages importable independently from the working directory.
+prj_path = Path(__file__).resolve().parents[2]
 if str(prj_path) not in sys.path:
     sys.path.insert(0, str(prj_path))
 
@@ -45,21 +42,18 @@ from astarte.device import (
     DeviceMqtt,
     InterfaceNotFoundError,
 )
+from e2etest.common.callback_loop import get_callback_loop
+from e2etest.common.config import PROJECT_ROOT, TestCfg
+from e2etest.common.database import peek_database
+from e2etest.common.http_requests import (
+    get_server_interface,
+    wait_server_interface,
+    wait_server_interface_removed,
+)
 
-config_path = Path.joinpath(Path.cwd(), "e2etest", "common", "config.py")
-spec = importlib.util.spec_from_file_location("config", config_path)
-config = importlib.util.module_from_spec(spec)
-sys.modules["config"] = config
-spec.loader.exec_module(config)
-
-http_requests_path = Path.joinpath(Path.cwd(), "e2etest", "common", "http_requests.py")
-spec = importlib.util.spec_from_file_location("http_requests", http_requests_path)
-http_requests = importlib.util.module_from_spec(spec)
-sys.modules["http_requests"] = http_requests
-spec.loader.exec_module(http_requests)
-
-from config import TestCfg
-from http_requests import get_server_interface
+# Set from the callbacks loop, waited on by the connection helpers
+connected = Event()
+disconnected = Event()
 
 
 def on_connected_cbk(_):
@@ -67,6 +61,8 @@ def on_connected_cbk(_):
     Callback for a connection event.
     """
     cprint("Device connected.", color="green", flush=True)
+    disconnected.clear()
+    connected.set()
 
 
 def on_data_received_cbk(_, name: str, path: str, payload: dict):
@@ -84,19 +80,18 @@ def on_disconnected_cbk(_, reason: int):
         cprint(f"Device gracefully disconnected.", color="green", flush=True)
     else:
         cprint(f"Device disconnected because: {reason}.", color="red", flush=True)
+    connected.clear()
+    disconnected.set()
 
 
 def device_connect(device: DeviceMqtt):
     """
     Helper function to perform device connection.
     """
-    time.sleep(0.5)
-
+    connected.clear()
     device.connect()
 
-    time.sleep(0.5)
-
-    if not device.is_connected():
+    if not connected.wait(timeout=5) or not device.is_connected():
         cprint("\nConnection failed.", color="red", flush=True)
         sys.exit(1)
 
@@ -105,13 +100,10 @@ def device_disconnect(device: DeviceMqtt):
     """
     Helper function to perform device disconnection.
     """
-    time.sleep(0.5)
-
+    disconnected.clear()
     device.disconnect()
 
-    time.sleep(0.5)
-
-    if device.is_connected():
+    if not disconnected.wait(timeout=5) or device.is_connected():
         cprint("\nDisconnection failed.", color="red", flush=True)
         sys.exit(1)
 
@@ -196,8 +188,6 @@ def test_add_and_remove_interface_while_connected(device: DeviceMqtt, test_cfg:
 
     device.remove_interface(test_cfg.interface_device_data)
 
-    time.sleep(0.5)
-
     try:
         device.send(
             test_cfg.interface_device_data,
@@ -212,25 +202,17 @@ def test_add_and_remove_interface_while_connected(device: DeviceMqtt, test_cfg:
         cprint("Exception not raised for send on removed interface.", color="red", flush=True)
         sys.exit(1)
 
-    try:
-        get_server_interface(test_cfg, test_cfg.interface_device_data, quiet=True)
-    except requests.exceptions.HTTPError:
-        # Correct behaviour
-        pass
-    else:
+    # The server updates the introspection asynchronously, wait for the interface removal
+    if not wait_server_interface_removed(test_cfg, test_cfg.interface_device_data):
         cprint("Exception not raised for http get on removed interface.", color="red", flush=True)
         sys.exit(1)
 
-    time.sleep(0.5)
-
     device.add_interface_from_file(
         test_cfg.interfaces_fld.joinpath(
             "org.astarte-platform.python.e2etest.DeviceDatastream.json"
         )
     )
 
-    time.sleep(0.5)
-
     device.send(
         test_cfg.interface_device_data,
         "/booleanarray_endpoint",
@@ -238,25 +220,12 @@ def test_add_and_remove_interface_while_connected(device: DeviceMqtt, test_cfg:
         datetime.now(tz=timezone.utc),
     )
 
-    json_res = get_server_interface(test_cfg, test_cfg.interface_device_data)
-    assert json_res["data"]["booleanarray_endpoint"]["value"] == [False, False]
-
-
-def peek_database(persistency_dir: Path, device_id: str, interface_name: str):
-    """
-    Take a peek in the device database.
-    """
-    database_path = persistency_dir.joinpath(device_id, "caching", "astarte.db")
-    properties = (
-        sqlite3.connect(database_path)
-        .cursor()
-        .execute("SELECT * FROM properties WHERE interface=?", (interface_name,))
-        .fetchall()
+    json_res = wait_server_interface(
+        test_cfg,
+        test_cfg.interface_device_data,
+        lambda data: data.get("booleanarray_endpoint", {}).get("value") == [False, False],
     )
-    parsed_properties = []
-    for interface, major, path, value in properties:
-        parsed_properties += [(interface, major, path, pickle.loads(value))]
-    return parsed_properties
+    assert json_res["data"]["booleanarray_endpoint"]["value"] == [False, False]
 
 
 def test_add_and_remove_property_interface_while_connected(
@@ -363,7 +332,7 @@ def main(cb_loop: asyncio.AbstractEventLoop, test_cfg: TestCfg):
     """
     Generate the device and run the end to end tests.
     """
-    persistency_dir = Path.joinpath(Path.cwd(), "e2etest", "reconnection", "build")
+    persistency_dir = PROJECT_ROOT / "e2etest" / "reconnection" / "build"
     if not Path.is_dir(persistency_dir):
         os.makedirs(persistency_dir)
 
@@ -403,24 +372,14 @@ def main(cb_loop: asyncio.AbstractEventLoop, test_cfg: TestCfg):
         time.sleep(0.5)
 
 
-def start_call_back_loop(loop: asyncio.AbstractEventLoop) -> None:
-    """
-    Start an asyncio event loop, used for the device call back.
-    """
-    asyncio.set_event_loop(loop)
-    loop.run_forever()
-
-
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--device_n", default=3, type=int)
     parser.add_argument("--mock_data_n", default=1, type=int)
     args = parser.parse_args()
 
-    # Generate an async loop and thread
-    call_back_loop = asyncio.new_event_loop()
-    call_back_thread = Thread(target=start_call_back_loop, args=[call_back_loop], daemon=True)
-    call_back_thread.start()
+    # Get the async loop and thread shared by the device callbacks
+    call_back_loop, call_back_thread = get_callback_loop()
 
     try:
         main(call_back_loop, TestCfg(device_n=args.device_n, mock_data_n=args.mock_data_n))
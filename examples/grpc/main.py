@@ -27,6 +27,7 @@ import time
 import tomllib
 from datetime import datetime, timezone
 from pathlib import Path
+from threading import Event
 
 from astarte.device import DeviceGrpc
 
@@ -34,11 +35,16 @@ _INTERFACES_DIR = Path(__file__).parent.joinpath("interfaces").absolute()
 _CONFIGURATION_FILE = Path(__file__).parent.joinpath("config.toml").absolute()
 
 
+# Set once the device is connected, avoids spinning on is_connected()
+connected = Event()
+
+
 def on_connected_cbk(_):
     """
     Callback for a connection event.
     """
     print("Device connected.")
+    connected.set()
 
 
 def on_data_received_cbk(device: DeviceGrpc, interface_name: str, path: str, payload: dict):
@@ -60,19 +66,21 @@ def stream_data(device: DeviceGrpc):
     """
     Stream some hardcoded tata data from a device to Astarte.
     """
+    # Single timestamp shared by all the data sent below
+    timestamp = datetime.now(tz=timezone.utc)
 
     # Send the binary blob endpoints
     device.send(
         "org.astarte-platform.python.examples.DeviceDatastream",
         "/binaryblob_endpoint",
         b"binblob",
-        datetime.now(tz=timezone.utc),
+        timestamp,
     )
     device.send(
         "org.astarte-platform.python.examples.DeviceDatastream",
         "/binaryblobarray_endpoint",
         [b"bin", b"blob"],
-        datetime.now(tz=timezone.utc),
+        timestamp,
     )
 
     # Send the boolean endpoints
@@ -80,27 +88,27 @@ def stream_data(device: DeviceGrpc):
         "org.astarte-platform.python.examples.DeviceDatastream",
         "/boolean_endpoint",
         False,
-        datetime.now(tz=timezone.utc),
+        timestamp,
     )
     device.send(
         "org.astarte-platform.python.examples.DeviceDatastream",
         "/booleanarray_endpoint",
         [False, True],
-        datetime.now(tz=timezone.utc),
+        timestamp,
     )
 
     # Send the datetime endpoints
     device.send(
         "org.astarte-platform.python.examples.DeviceDatastream",
         "/datetime_endpoint",
-        datetime.now(tz=timezone.utc),
-        datetime.now(tz=timezone.utc),
+        timestamp,
+        timestamp,
     )
     device.send(
         "org.astarte-platform.python.examples.DeviceDatastream",
         "/datetimearray_endpoint",
-        [datetime.now(tz=timezone.utc), datetime.now(tz=timezone.utc)],
-        datetime.now(tz=timezone.utc),
+        [timestamp, timestamp],
+        timestamp,
     )
 
     # Send the double endpoints
@@ -108,13 +116,13 @@ def stream_data(device: DeviceGrpc):
         "org.astarte-platform.python.examples.DeviceDatastream",
         "/double_endpoint",
         21.3,
-        datetime.now(tz=timezone.utc),
+        timestamp,
     )
     device.send(
         "org.astarte-platform.python.examples.DeviceDatastream",
         "/doublearray_endpoint",
         [1123.0, 12.232],
-        datetime.now(tz=timezone.utc),
+        timestamp,
     )
 
     # Send the integer endpoints
@@ -122,13 +130,13 @@ def stream_data(device: DeviceGrpc):
         "org.astarte-platform.python.examples.DeviceDatastream",
         "/integer_endpoint",
         11,
-        datetime.now(tz=timezone.utc),
+        timestamp,
     )
     device.send(
         "org.astarte-platform.python.examples.DeviceDatastream",
         "/integerarray_endpoint",
         [452, 0],
-        datetime.now(tz=timezone.utc),
+        timestamp,
     )
 
     # Send the long integer endpoints
@@ -136,13 +144,13 @@ def stream_data(device: DeviceGrpc):
         "org.astarte-platform.python.examples.DeviceDatastream",
         "/longinteger_endpoint",
         2**34,
-        datetime.now(tz=timezone.utc),
+        timestamp,
     )
     device.send(
         "org.astarte-platform.python.examples.DeviceDatastream",
         "/longintegerarray_endpoint",
         [2**34, 2**35 + 11],
-        datetime.now(tz=timezone.utc),
+        timestamp,
     )
 
     # Send the string endpoints
@@ -150,13 +158,13 @@ def stream_data(device: DeviceGrpc):
         "org.astarte-platform.python.examples.DeviceDatastream",
         "/string_endpoint",
         "Hello world!",
-        datetime.now(tz=timezone.utc),
+        timestamp,
     )
     device.send(
         "org.astarte-platform.python.examples.DeviceDatastream",
         "/stringarray_endpoint",
         ["Hello,", " world!"],
-        datetime.now(tz=timezone.utc),
+        timestamp,
     )
 
 
@@ -193,8 +201,8 @@ if __name__ == "__main__":
     )
     # # Connect the device
     device.connect()
-    while not device.is_connected():
-        pass
+    if not connected.wait(timeout=30):
+        raise TimeoutError("Device connection timed out.")
 
     # Stream some data from device to Astarte
     stream_data(device)
@@ -22,12 +22,13 @@ Example showing how to send/receive individual/aggregated datastreams and set/un
 
 """
 
+import argparse
 import asyncio
 import tempfile
 import time
 import tomllib
 from pathlib import Path
-from threading import Thread
+from threading import Event, Thread
 from typing import Optional, Tuple
 
 from transmit_data import (
@@ -43,11 +44,16 @@ _INTERFACES_DIR = Path(__file__).parent.joinpath("interfaces").absolute()
 _CONFIGURATION_FILE = Path(__file__).parent.joinpath("config.toml").absolute()
 
 
+# Set once the device is connected, avoids spinning on is_connected()
+connected = Event()
+
+
 def on_connected_cbk(_):
     """
     Callback for a connection event.
     """
     print("Device connected.")
+    connected.set()
 
 
 def on_data_received_cbk(_: DeviceMqtt, interface_name: str, path: str, payload: dict):
@@ -114,8 +120,8 @@ def main(cb_loop: Optional[asyncio.AbstractEventLoop] = None):
         )
         # Connect the device
         device.connect()
-        while not device.is_connected():
-            pass
+        if not connected.wait(timeout=30):
+            raise TimeoutError("Device connection timed out.")
 
         time.sleep(1)
 
@@ -145,12 +151,24 @@ def main(cb_loop: Optional[asyncio.AbstractEventLoop] = None):
 # If called as a script
 if __name__ == "__main__":
 
-    # [Optional] Preparing a different asyncio loop for the callbacks to prevent deadlocks
-    # Replace with loop = None to run the Astarte event callback in the main thread
-    print("Generating async loop.")
-    (loop, thread) = _generate_async_loop()
-    main(loop)
-    loop.call_soon_threadsafe(loop.stop)
-    print("Requested async loop stop.")
-    thread.join()
-    print("Async loop stopped.")
+    parser = argparse.ArgumentParser(description="MQTT example for the Astarte device SDK Python")
+    parser.add_argument(
+        "--async-callbacks",
+        action="store_true",
+        help="Run the event callbacks on a dedicated asyncio loop instead of the MQTT client thread",
+    )
+    args = parser.parse_args()
+
+    # [Optional] Preparing a different asyncio loop for the callbacks to prevent deadlocks when
+    # the callbacks call the device methods. These callbacks only print, so by default they run
+    # directly in the MQTT client thread, saving a thread and a hop for each event.
+    if args.async_callbacks:
+        print("Generating async loop.")
+        (loop, thread) = _generate_async_loop()
+        main(loop)
+        loop.call_soon_threadsafe(loop.stop)
+        print("Requested async loop stop.")
+        thread.join()
+        print("Async loop stopped.")
+    else:
+        main()
@@ -25,19 +25,21 @@ def stream_individuals(device: DeviceMqtt):
     """
     Stream some hardcoded individual datastreams from a device to Astarte.
     """
+    # Single timestamp shared by all the data sent below
+    timestamp = datetime.now(tz=timezone.utc)
 
     # Send the binary blob endpoints
     device.send(
         "org.astarte-platform.python.examples.DeviceDatastream",
         "/binaryblob_endpoint",
         b"binblob",
-        datetime.now(tz=timezone.utc),
+        timestamp,
     )
     device.send(
         "org.astarte-platform.python.examples.DeviceDatastream",
         "/binaryblobarray_endpoint",
         [b"bin", b"blob"],
-        datetime.now(tz=timezone.utc),
+        timestamp,
     )
 
     # Send the boolean endpoints
@@ -45,27 +47,27 @@ def stream_individuals(device: DeviceMqtt):
         "org.astarte-platform.python.examples.DeviceDatastream",
         "/boolean_endpoint",
         False,
-        datetime.now(tz=timezone.utc),
+        timestamp,
     )
     device.send(
         "org.astarte-platform.python.examples.DeviceDatastream",
         "/booleanarray_endpoint",
         [False, True],
-        datetime.now(tz=timezone.utc),
+        timestamp,
     )
 
     # Send the datetime endpoints
     device.send(
         "org.astarte-platform.python.examples.DeviceDatastream",
         "/datetime_endpoint",
-        datetime.now(tz=timezone.utc),
-        datetime.now(tz=timezone.utc),
+        timestamp,
+        timestamp,
     )
     device.send(
         "org.astarte-platform.python.examples.DeviceDatastream",
         "/datetimearray_endpoint",
-        [datetime.now(tz=timezone.utc)],
-        datetime.now(tz=timezone.utc),
+        [timestamp],
+        timestamp,
     )
 
     # Send the double endpoints
@@ -73,13 +75,13 @@ def stream_individuals(device: DeviceMqtt):
         "org.astarte-platform.python.examples.DeviceDatastream",
         "/double_endpoint",
         21.3,
-        datetime.now(tz=timezone.utc),
+        timestamp,
     )
     device.send(
         "org.astarte-platform.python.examples.DeviceDatastream",
         "/doublearray_endpoint",
         [1123.0, 12.232],
-        datetime.now(tz=timezone.utc),
+        timestamp,
     )
 
     # Send the integer endpoints
@@ -87,13 +89,13 @@ def stream_individuals(device: DeviceMqtt):
         "org.astarte-platform.python.examples.DeviceDatastream",
         "/integer_endpoint",
         11,
-        datetime.now(tz=timezone.utc),
+        timestamp,
     )
     device.send(
         "org.astarte-platform.python.examples.DeviceDatastream",
         "/integerarray_endpoint",
         [452, 0],
-        datetime.now(tz=timezone.utc),
+        timestamp,
     )
 
     # Send the long integer endpoints
@@ -101,13 +103,13 @@ def stream_individuals(device: DeviceMqtt):
         "org.astarte-platform.python.examples.DeviceDatastream",
         "/longinteger_endpoint",
         2**34,
-        datetime.now(tz=timezone.utc),
+        timestamp,
     )
     device.send(
         "org.astarte-platform.python.examples.DeviceDatastream",
         "/longintegerarray_endpoint",
         [2**34, 2**35 + 11],
-        datetime.now(tz=timezone.utc),
+        timestamp,
     )
 
     # Send the string endpoints
@@ -115,13 +117,13 @@ def stream_individuals(device: DeviceMqtt):
         "org.astarte-platform.python.examples.DeviceDatastream",
         "/string_endpoint",
         "Hello world!",
-        datetime.now(tz=timezone.utc),
+        timestamp,
     )
     device.send(
         "org.astarte-platform.python.examples.DeviceDatastream",
         "/stringarray_endpoint",
         ["Hello,", " world!"],
-        datetime.now(tz=timezone.utc),
+        timestamp,
     )
 
 
@@ -129,6 +131,7 @@ def stream_aggregates(device: DeviceMqtt):
     """
     Stream some hardcoded aggregated datastreams from a device to Astarte.
     """
+    timestamp = datetime.now(tz=timezone.utc)
 
     aggregated_data = {
         "binaryblob_endpoint": bytes([0x53, 0x47, 0x56, 0x73, 0x62, 0x47, 0x38, 0x3D]),
@@ -138,10 +141,10 @@ def stream_aggregates(device: DeviceMqtt):
         ],
         "boolean_endpoint": True,
         "booleanarray_endpoint": [False, True, False],
-        "datetime_endpoint": datetime.now(tz=timezone.utc),
+        "datetime_endpoint": timestamp,
         "datetimearray_endpoint": [
-            datetime.now(tz=timezone.utc),
-            datetime.now(tz=timezone.utc),
+            timestamp,
+            timestamp,
         ],
         "double_endpoint": 11.3259,
         "doublearray_endpoint": [11.3259, 43.453, 33.0],
@@ -163,6 +166,7 @@ def set_properties(device: DeviceMqtt):
     """
     Set some hardcoded properties from a device to Astarte.
     """
+    timestamp = datetime.now(tz=timezone.utc)
 
     device.send(
         "org.astarte-platform.python.examples.DeviceProperty",
@@ -190,12 +194,12 @@ def set_properties(device: DeviceMqtt):
     device.send(
         "org.astarte-platform.python.examples.DeviceProperty",
         "/s33/datetime_endpoint",
-        datetime.now(tz=timezone.utc),
+        timestamp,
     )
     device.send(
         "org.astarte-platform.python.examples.DeviceProperty",
         "/s33/datetimearray_endpoint",
-        [datetime.now(tz=timezone.utc), datetime.now(tz=timezone.utc)],
+        [timestamp, timestamp],
     )
     device.send(
         "org.astarte-platform.python.examples.DeviceProperty",
@@ -21,7 +21,8 @@
 # pylint: disable=missing-return-type-doc,no-value-for-parameter,protected-access,
 # pylint: disable=too-many-public-methods,no-self-use
 
-import datetime
+import asyncio
+import json
 import unittest
 from http import HTTPStatus
 from unittest import mock
@@ -40,24 +41,22 @@ from astarte.device.exceptions import (
 
 class UnitTests(unittest.TestCase):
     def setUp(self):
-        pass
+        pairing_handler.clear_verify_cache()
 
-    @mock.patch("astarte.device.pairing_handler.requests.post")
+    @mock.patch("astarte.device.pairing_handler.requests.request")
     @mock.patch("astarte.device.pairing_handler.jwt.encode")
-    @mock.patch("astarte.device.pairing_handler.datetime")
-    @mock.patch("astarte.device.pairing_handler.timedelta")
-    @mock.patch("astarte.device.pairing_handler.open", new_callable=mock.mock_open)
+    @mock.patch("astarte.device.pairing_handler.time")
+    @mock.patch("astarte.device.pairing_handler.Path")
     def test_register_device_with_private_key(
-        self, mock_open, mock_timedelta, mock_datetime, mock_jwt_encode, mock_request_post
+        self, mock_path, mock_time, mock_jwt_encode, mock_request
     ):
         # Mock return values for __generate_token
-        mock_open.return_value.read.return_value = "<private key content>"
-        mock_datetime.now.return_value = datetime.datetime.now()
-        mock_timedelta.return_value = datetime.timedelta(seconds=30)
+        mock_path.return_value.read_bytes.return_value = b"<private key content>"
+        mock_time.time.return_value = 1700000000.5
 
         # Mock return values for __register_device
-        mock_request_post.return_value.status_code = HTTPStatus.CREATED
-        mock_request_post.return_value.json.return_value = {
+        mock_request.return_value.status_code = HTTPStatus.CREATED
+        mock_request.return_value.json.return_value = {
             "data": {"credentials_secret": "<credential secret>"}
         }
 
@@ -70,17 +69,16 @@ class UnitTests(unittest.TestCase):
         )
 
         # Checks for __generate_token
-        mock_open.assert_called_once_with("<private key file>", "r", encoding="utf-8")
-        mock_open.return_value.read.assert_called_once()
-        mock_datetime.now.assert_called_once()
-        mock_timedelta.assert_called_once_with(seconds=30)
+        mock_path.assert_called_once_with("<private key file>")
+        mock_path.return_value.read_bytes.assert_called_once()
+        mock_time.time.assert_called_once()
         expected_claims = {
             "a_pa": [".*::.*"],
-            "iat": mock_datetime.now.return_value,
-            "exp": mock_datetime.now.return_value + mock_timedelta.return_value,
+            "iat": 1700000000,
+            "exp": 1700000030,
         }
         mock_jwt_encode.assert_called_once_with(
-            expected_claims, "<private key content>", algorithm="RS256"
+            expected_claims, b"<private key content>", algorithm="RS256"
         )
         mock_jwt_encode.return_value.decode.assert_called_once()
 
@@ -89,31 +87,30 @@ class UnitTests(unittest.TestCase):
         expected_headers = {
             "Authorization": f"Bearer {mock_jwt_encode.return_value.decode.return_value}"
         }
-        mock_request_post.assert_called_once_with(
+        mock_request.assert_called_once_with(
+            "POST",
             "<pairing base URL>/v1/<realm name>/agent/devices",
-            json=expected_json,
             headers=expected_headers,
+            json=expected_json,
             verify=True,
             timeout=30,
         )
         self.assertEqual(result, "<credential secret>")
 
-    @mock.patch("astarte.device.pairing_handler.requests.post")
+    @mock.patch("astarte.device.pairing_handler.requests.request")
     @mock.patch("astarte.device.pairing_handler.jwt.encode")
-    @mock.patch("astarte.device.pairing_handler.datetime")
-    @mock.patch("astarte.device.pairing_handler.timedelta")
-    @mock.patch("astarte.device.pairing_handler.open", new_callable=mock.mock_open)
+    @mock.patch("astarte.device.pairing_handler.time")
+    @mock.patch("astarte.device.pairing_handler.Path")
     def test_register_device_with_private_key_ignore_ssl_errors(
-        self, mock_open, mock_timedelta, mock_datetime, mock_jwt_encode, mock_request_post
+        self, mock_path, mock_time, mock_jwt_encode, mock_request
     ):
         # Mock return values for __generate_token
-        mock_open.return_value.read.return_value = "<private key content>"
-        mock_datetime.now.return_value = datetime.datetime.now()
-        mock_timedelta.return_value = datetime.timedelta(seconds=30)
+        mock_path.return_value.read_bytes.return_value = b"<private key content>"
+        mock_time.time.return_value = 1700000000.5
 
         # Mock return values for __register_device
-        mock_request_post.return_value.status_code = HTTPStatus.CREATED
-        mock_request_post.return_value.json.return_value = {
+        mock_request.return_value.status_code = HTTPStatus.CREATED
+        mock_request.return_value.json.return_value = {
             "data": {"credentials_secret": "<credential secret>"}
         }
 
@@ -126,17 +123,16 @@ class UnitTests(unittest.TestCase):
         )
 
         # Checks for __generate_token
-        mock_open.assert_called_once_with("<private key file>", "r", encoding="utf-8")
-        mock_open.return_value.read.assert_called_once()
-        mock_datetime.now.assert_called_once()
-        mock_timedelta.assert_called_once_with(seconds=30)
+        mock_path.assert_called_once_with("<private key file>")
+        mock_path.return_value.read_bytes.assert_called_once()
+        mock_time.time.assert_called_once()
         expected_claims = {
             "a_pa": [".*::.*"],
-            "iat": mock_datetime.now.return_value,
-            "exp": mock_datetime.now.return_value + mock_timedelta.return_value,
+            "iat": 1700000000,
+            "exp": 1700000030,
         }
         mock_jwt_encode.assert_called_once_with(
-            expected_claims, "<private key content>", algorithm="RS256"
+            expected_claims, b"<private key content>", algorithm="RS256"
         )
         mock_jwt_encode.return_value.decode.assert_called_once()
 
@@ -145,32 +141,32 @@ class UnitTests(unittest.TestCase):
         expected_headers = {
             "Authorization": f"Bearer {mock_jwt_encode.return_value.decode.return_value}"
         }
-        mock_request_post.assert_called_once_with(
+        mock_request.assert_called_once_with(
+            "POST",
             "<pairing base URL>/v1/<realm name>/agent/devices",
-            json=expected_json,
             headers=expected_headers,
+            json=expected_json,
             verify=False,
             timeout=30,
         )
         self.assertEqual(result, "<credential secret>")
 
-    @mock.patch("astarte.device.pairing_handler.requests.post")
+    @mock.patch("astarte.device.pairing_handler.requests.request")
     @mock.patch("astarte.device.pairing_handler.jwt.encode")
-    @mock.patch("astarte.device.pairing_handler.datetime")
-    @mock.patch("astarte.device.pairing_handler.timedelta")
-    @mock.patch("astarte.device.pairing_handler.open", new_callable=mock.mock_open)
+    @mock.patch("astarte.device.pairing_handler.time")
+    @mock.patch("astarte.device.pairing_handler.Path")
     def test_register_device_with_private_key_open_raises(
-        self, mock_open, mock_timedelta, mock_datetime, mock_jwt_encode, mock_request_post
+        self, mock_path, mock_time, mock_jwt_encode, mock_request
     ):
         # Mock return values for __generate_token
-        mock_open.side_effect = mock.Mock(side_effect=FileNotFoundError("Msg"))
-        mock_open.return_value.read.return_value = "<private key content>"
-        mock_datetime.now.return_value = datetime.datetime.now()
-        mock_timedelta.return_value = datetime.timedelta(seconds=30)
+        mock_path.return_value.read_bytes.side_effect = mock.Mock(
+            side_effect=FileNotFoundError("Msg")
+        )
+        mock_time.time.return_value = 1700000000.5
 
         # Mock return values for __register_device
-        mock_request_post.return_value.status_code = HTTPStatus.CREATED
-        mock_request_post.return_value.json.return_value = {
+        mock_request.return_value.status_code = HTTPStatus.CREATED
+        mock_request.return_value.json.return_value = {
             "data": {"credentials_secret": "<credential secret>"}
         }
 
@@ -186,33 +182,30 @@ class UnitTests(unittest.TestCase):
         )
 
         # Checks for __generate_token
-        mock_open.assert_called_once_with("<private key file>", "r", encoding="utf-8")
-        mock_open.return_value.read.assert_not_called()
-        mock_datetime.now.assert_not_called()
-        mock_timedelta.assert_not_called()
+        mock_path.assert_called_once_with("<private key file>")
+        mock_path.return_value.read_bytes.assert_called_once()
+        mock_time.time.assert_not_called()
         mock_jwt_encode.assert_not_called()
         mock_jwt_encode.return_value.decode.assert_not_called()
 
         # Checks for __register_device
-        mock_request_post.assert_not_called()
+        mock_request.assert_not_called()
 
-    @mock.patch("astarte.device.pairing_handler.requests.post")
+    @mock.patch("astarte.device.pairing_handler.requests.request")
     @mock.patch("astarte.device.pairing_handler.jwt.encode")
-    @mock.patch("astarte.device.pairing_handler.datetime")
-    @mock.patch("astarte.device.pairing_handler.timedelta")
-    @mock.patch("astarte.device.pairing_handler.open", new_callable=mock.mock_open)
+    @mock.patch("astarte.device.pairing_handler.time")
+    @mock.patch("astarte.device.pairing_handler.Path")
     def test_register_device_with_private_key_jwt_encode_raises(
-        self, mock_open, mock_timedelta, mock_datetime, mock_jwt_encode, mock_request_post
+        self, mock_path, mock_time, mock_jwt_encode, mock_request
     ):
         # Mock return values for __generate_token
-        mock_open.return_value.read.return_value = "<private key content>"
-        mock_datetime.now.return_value = datetime.datetime.now()
-        mock_timedelta.return_value = datetime.timedelta(seconds=30)
+        mock_path.return_value.read_bytes.return_value = b"<private key content>"
+        mock_time.time.return_value = 1700000000.5
         mock_jwt_encode.side_effect = mock.Mock(side_effect=exceptions.DecodeError("Msg"))
 
         # Mock return values for __register_device
-        mock_request_post.return_value.status_code = HTTPStatus.CREATED
-        mock_request_post.return_value.json.return_value = {
+        mock_request.return_value.status_code = HTTPStatus.CREATED
+        mock_request.return_value.json.return_value = {
             "data": {"credentials_secret": "<credential secret>"}
         }
 
@@ -228,42 +221,39 @@ class UnitTests(unittest.TestCase):
         )
 
         # Checks for __generate_token
-        mock_open.assert_called_once_with("<private key file>", "r", encoding="utf-8")
-        mock_open.return_value.read.assert_called_once()
-        mock_datetime.now.assert_called_once()
-        mock_timedelta.assert_called_once_with(seconds=30)
+        mock_path.assert_called_once_with("<private key file>")
+        mock_path.return_value.read_bytes.assert_called_once()
+        mock_time.time.assert_called_once()
         expected_claims = {
             "a_pa": [".*::.*"],
-            "iat": mock_datetime.now.return_value,
-            "exp": mock_datetime.now.return_value + mock_timedelta.return_value,
+            "iat": 1700000000,
+            "exp": 1700000030,
         }
         mock_jwt_encode.assert_called_once_with(
-            expected_claims, "<private key content>", algorithm="RS256"
+            expected_claims, b"<private key content>", algorithm="RS256"
         )
         mock_jwt_encode.return_value.decode.assert_not_called()
 
         # Checks for __register_device
-        mock_request_post.assert_not_called()
+        mock_request.assert_not_called()
 
-    @mock.patch("astarte.device.pairing_handler.requests.post")
+    @mock.patch("astarte.device.pairing_handler.requests.request")
     @mock.patch("astarte.device.pairing_handler.jwt.encode")
-    @mock.patch("astarte.device.pairing_handler.datetime")
-    @mock.patch("astarte.device.pairing_handler.timedelta")
-    @mock.patch("astarte.device.pairing_handler.open", new_callable=mock.mock_open)
+    @mock.patch("astarte.device.pairing_handler.time")
+    @mock.patch("astarte.device.pairing_handler.Path")
     def test_register_device_with_private_key_jwt_decode_raises(
-        self, mock_open, mock_timedelta, mock_datetime, mock_jwt_encode, mock_request_post
+        self, mock_path, mock_time, mock_jwt_encode, mock_request
     ):
         # Mock return values for __generate_token
-        mock_open.return_value.read.return_value = "<private key content>"
-        mock_datetime.now.return_value = datetime.datetime.now()
-        mock_timedelta.return_value = datetime.timedelta(seconds=30)
+        mock_path.return_value.read_bytes.return_value = b"<private key content>"
+        mock_time.time.return_value = 1700000000.5
         mock_jwt_encode.return_value.decode.side_effect = mock.Mock(
             side_effect=exceptions.DecodeError("Msg")
         )
 
         # Mock return values for __register_device
-        mock_request_post.return_value.status_code = HTTPStatus.CREATED
-        mock_request_post.return_value.json.return_value = {
+        mock_request.return_value.status_code = HTTPStatus.CREATED
+        mock_request.return_value.json.return_value = {
             "data": {"credentials_secret": "<credential secret>"}
         }
 
@@ -279,39 +269,36 @@ class UnitTests(unittest.TestCase):
         )
 
         # Checks for __generate_token
-        mock_open.assert_called_once_with("<private key file>", "r", encoding="utf-8")
-        mock_open.return_value.read.assert_called_once()
-        mock_datetime.now.assert_called_once()
-        mock_timedelta.assert_called_once_with(seconds=30)
+        mock_path.assert_called_once_with("<private key file>")
+        mock_path.return_value.read_bytes.assert_called_once()
+        mock_time.time.assert_called_once()
         expected_claims = {
             "a_pa": [".*::.*"],
-            "iat": mock_datetime.now.return_value,
-            "exp": mock_datetime.now.return_value + mock_timedelta.return_value,
+            "iat": 1700000000,
+            "exp": 1700000030,
         }
         mock_jwt_encode.assert_called_once_with(
-            expected_claims, "<private key content>", algorithm="RS256"
+            expected_claims, b"<private key content>", algorithm="RS256"
         )
         mock_jwt_encode.return_value.decode.assert_called_once()
 
         # Checks for __register_device
-        mock_request_post.assert_not_called()
+        mock_request.assert_not_called()
 
-    @mock.patch("astarte.device.pairing_handler.requests.post")
+    @mock.patch("astarte.device.pairing_handler.requests.request")
     @mock.patch("astarte.device.pairing_handler.jwt.encode")
-    @mock.patch("astarte.device.pairing_handler.datetime")
-    @mock.patch("astarte.device.pairing_handler.timedelta")
-    @mock.patch("astarte.device.pairing_handler.open", new_callable=mock.mock_open)
+    @mock.patch("astarte.device.pairing_handler.time")
+    @mock.patch("astarte.device.pairing_handler.Path")
     def test_register_device_with_private_key_http_post_unauthorized_raises(
-        self, mock_open, mock_timedelta, mock_datetime, mock_jwt_encode, mock_request_post
+        self, mock_path, mock_time, mock_jwt_encode, mock_request
     ):
         # Mock return values for __generate_token
-        mock_open.return_value.read.return_value = "<private key content>"
-        mock_datetime.now.return_value = datetime.datetime.now()
-        mock_timedelta.return_value = datetime.timedelta(seconds=30)
+        mock_path.return_value.read_bytes.return_value = b"<private key content>"
+        mock_time.time.return_value = 1700000000.5
 
         # Mock return values for __register_device
-        mock_request_post.return_value.status_code = HTTPStatus.UNAUTHORIZED
-        mock_request_post.return_value.json.return_value = {
+        mock_request.return_value.status_code = HTTPStatus.UNAUTHORIZED
+        mock_request.return_value.json.return_value = {
             "data": {"credentials_secret": "<credential secret>"}
         }
 
@@ -327,17 +314,16 @@ class UnitTests(unittest.TestCase):
         )
 
         # Checks for __generate_token
-        mock_open.assert_called_once_with("<private key file>", "r", encoding="utf-8")
-        mock_open.return_value.read.assert_called_once()
-        mock_datetime.now.assert_called_once()
-        mock_timedelta.assert_called_once_with(seconds=30)
+        mock_path.assert_called_once_with("<private key file>")
+        mock_path.return_value.read_bytes.assert_called_once()
+        mock_time.time.assert_called_once()
         expected_claims = {
             "a_pa": [".*::.*"],
-            "iat": mock_datetime.now.return_value,
-            "exp": mock_datetime.now.return_value + mock_timedelta.return_value,
+            "iat": 1700000000,
+            "exp": 1700000030,
         }
         mock_jwt_encode.assert_called_once_with(
-            expected_claims, "<private key content>", algorithm="RS256"
+            expected_claims, b"<private key content>", algorithm="RS256"
         )
         mock_jwt_encode.return_value.decode.assert_called_once()
 
@@ -346,30 +332,29 @@ class UnitTests(unittest.TestCase):
         expected_headers = {
             "Authorization": f"Bearer {mock_jwt_encode.return_value.decode.return_value}"
         }
-        mock_request_post.assert_called_once_with(
+        mock_request.assert_called_once_with(
+            "POST",
             "<pairing base URL>/v1/<realm name>/agent/devices",
-            json=expected_json,
             headers=expected_headers,
+            json=expected_json,
             verify=True,
             timeout=30,
         )
 
-    @mock.patch("astarte.device.pairing_handler.requests.post")
+    @mock.patch("astarte.device.pairing_handler.requests.request")
     @mock.patch("astarte.device.pairing_handler.jwt.encode")
-    @mock.patch("astarte.device.pairing_handler.datetime")
-    @mock.patch("astarte.device.pairing_handler.timedelta")
-    @mock.patch("astarte.device.pairing_handler.open", new_callable=mock.mock_open)
+    @mock.patch("astarte.device.pairing_handler.time")
+    @mock.patch("astarte.device.pairing_handler.Path")
     def test_register_device_with_private_key_http_post_forbidden_raises(
-        self, mock_open, mock_timedelta, mock_datetime, mock_jwt_encode, mock_request_post
+        self, mock_path, mock_time, mock_jwt_encode, mock_request
     ):
         # Mock return values for __generate_token
-        mock_open.return_value.read.return_value = "<private key content>"
-        mock_datetime.now.return_value = datetime.datetime.now()
-        mock_timedelta.return_value = datetime.timedelta(seconds=30)
+        mock_path.return_value.read_bytes.return_value = b"<private key content>"
+        mock_time.time.return_value = 1700000000.5
 
         # Mock return values for __register_device
-        mock_request_post.return_value.status_code = HTTPStatus.FORBIDDEN
-        mock_request_post.return_value.json.return_value = {
+        mock_request.return_value.status_code = HTTPStatus.FORBIDDEN
+        mock_request.return_value.json.return_value = {
             "data": {"credentials_secret": "<credential secret>"}
         }
 
@@ -385,17 +370,16 @@ class UnitTests(unittest.TestCase):
         )
 
         # Checks for __generate_token
-        mock_open.assert_called_once_with("<private key file>", "r", encoding="utf-8")
-        mock_open.return_value.read.assert_called_once()
-        mock_datetime.now.assert_called_once()
-        mock_timedelta.assert_called_once_with(seconds=30)
+        mock_path.assert_called_once_with("<private key file>")
+        mock_path.return_value.read_bytes.assert_called_once()
+        mock_time.time.assert_called_once()
         expected_claims = {
             "a_pa": [".*::.*"],
-            "iat": mock_datetime.now.return_value,
-            "exp": mock_datetime.now.return_value + mock_timedelta.return_value,
+            "iat": 1700000000,
+            "exp": 1700000030,
         }
         mock_jwt_encode.assert_called_once_with(
-            expected_claims, "<private key content>", algorithm="RS256"
+            expected_claims, b"<private key content>", algorithm="RS256"
         )
         mock_jwt_encode.return_value.decode.assert_called_once()
 
@@ -404,30 +388,29 @@ class UnitTests(unittest.TestCase):
         expected_headers = {
             "Authorization": f"Bearer {mock_jwt_encode.return_value.decode.return_value}"
         }
-        mock_request_post.assert_called_once_with(
+        mock_request.assert_called_once_with(
+            "POST",
             "<pairing base URL>/v1/<realm name>/agent/devices",
-            json=expected_json,
             headers=expected_headers,
+            json=expected_json,
             verify=True,
             timeout=30,
         )
 
-    @mock.patch("astarte.device.pairing_handler.requests.post")
+    @mock.patch("astarte.device.pairing_handler.requests.request")
     @mock.patch("astarte.device.pairing_handler.jwt.encode")
-    @mock.patch("astarte.device.pairing_handler.datetime")
-    @mock.patch("astarte.device.pairing_handler.timedelta")
-    @mock.patch("astarte.device.pairing_handler.open", new_callable=mock.mock_open)
+    @mock.patch("astarte.device.pairing_handler.time")
+    @mock.patch("astarte.device.pairing_handler.Path")
     def test_register_device_with_private_key_http_post_unprocessable_entity_raises(
-        self, mock_open, mock_timedelta, mock_datetime, mock_jwt_encode, mock_request_post
+        self, mock_path, mock_time, mock_jwt_encode, mock_request
     ):
         # Mock return values for __generate_token
-        mock_open.return_value.read.return_value = "<private key content>"
-        mock_datetime.now.return_value = datetime.datetime.now()
-        mock_timedelta.return_value = datetime.timedelta(seconds=30)
+        mock_path.return_value.read_bytes.return_value = b"<private key content>"
+        mock_time.time.return_value = 1700000000.5
 
         # Mock return values for __register_device
-        mock_request_post.return_value.status_code = HTTPStatus.UNPROCESSABLE_ENTITY
-        mock_request_post.return_value.json.return_value = {
+        mock_request.return_value.status_code = HTTPStatus.UNPROCESSABLE_ENTITY
+        mock_request.return_value.json.return_value = {
             "data": {"credentials_secret": "<credential secret>"}
         }
 
@@ -443,17 +426,16 @@ class UnitTests(unittest.TestCase):
         )
 
         # Checks for __generate_token
-        mock_open.assert_called_once_with("<private key file>", "r", encoding="utf-8")
-        mock_open.return_value.read.assert_called_once()
-        mock_datetime.now.assert_called_once()
-        mock_timedelta.assert_called_once_with(seconds=30)
+        mock_path.assert_called_once_with("<private key file>")
+        mock_path.return_value.read_bytes.assert_called_once()
+        mock_time.time.assert_called_once()
         expected_claims = {
             "a_pa": [".*::.*"],
-            "iat": mock_datetime.now.return_value,
-            "exp": mock_datetime.now.return_value + mock_timedelta.return_value,
+            "iat": 1700000000,
+            "exp": 1700000030,
         }
         mock_jwt_encode.assert_called_once_with(
-            expected_claims, "<private key content>", algorithm="RS256"
+            expected_claims, b"<private key content>", algorithm="RS256"
         )
         mock_jwt_encode.return_value.decode.assert_called_once()
 
@@ -462,30 +444,30 @@ class UnitTests(unittest.TestCase):
         expected_headers = {
             "Authorization": f"Bearer {mock_jwt_encode.return_value.decode.return_value}"
         }
-        mock_request_post.assert_called_once_with(
+        mock_request.assert_called_once_with(
+            "POST",
             "<pairing base URL>/v1/<realm name>/agent/devices",
-            json=expected_json,
             headers=expected_headers,
+            json=expected_json,
             verify=True,
             timeout=30,
         )
+        mock_request.return_value.json.assert_not_called()
 
-    @mock.patch("astarte.device.pairing_handler.requests.post")
+    @mock.patch("astarte.device.pairing_handler.requests.request")
     @mock.patch("astarte.device.pairing_handler.jwt.encode")
-    @mock.patch("astarte.device.pairing_handler.datetime")
-    @mock.patch("astarte.device.pairing_handler.timedelta")
-    @mock.patch("astarte.device.pairing_handler.open", new_callable=mock.mock_open)
+    @mock.patch("astarte.device.pairing_handler.time")
+    @mock.patch("astarte.device.pairing_handler.Path")
     def test_register_device_with_private_key_http_post_other_raises(
-        self, mock_open, mock_timedelta, mock_datetime, mock_jwt_encode, mock_request_post
+        self, mock_path, mock_time, mock_jwt_encode, mock_request
     ):
         # Mock return values for __generate_token
-        mock_open.return_value.read.return_value = "<private key content>"
-        mock_datetime.now.return_value = datetime.datetime.now()
-        mock_timedelta.return_value = datetime.timedelta(seconds=30)
+        mock_path.return_value.read_bytes.return_value = b"<private key content>"
+        mock_time.time.return_value = 1700000000.5
 
         # Mock return values for __register_device
-        mock_request_post.return_value.status_code = HTTPStatus.REQUEST_TIMEOUT
-        mock_request_post.return_value.json.return_value = {
+        mock_request.return_value.status_code = HTTPStatus.REQUEST_TIMEOUT
+        mock_request.return_value.json.return_value = {
             "data": {"credentials_secret": "<credential secret>"}
         }
 
@@ -501,17 +483,16 @@ class UnitTests(unittest.TestCase):
         )
 
         # Checks for __generate_token
-        mock_open.assert_called_once_with("<private key file>", "r", encoding="utf-8")
-        mock_open.return_value.read.assert_called_once()
-        mock_datetime.now.assert_called_once()
-        mock_timedelta.assert_called_once_with(seconds=30)
+        mock_path.assert_called_once_with("<private key file>")
+        mock_path.return_value.read_bytes.assert_called_once()
+        mock_time.time.assert_called_once()
         expected_claims = {
             "a_pa": [".*::.*"],
-            "iat": mock_datetime.now.return_value,
-            "exp": mock_datetime.now.return_value + mock_timedelta.return_value,
+            "iat": 1700000000,
+            "exp": 1700000030,
         }
         mock_jwt_encode.assert_called_once_with(
-            expected_claims, "<private key content>", algorithm="RS256"
+            expected_claims, b"<private key content>", algorithm="RS256"
         )
         mock_jwt_encode.return_value.decode.assert_called_once()
 
@@ -520,19 +501,20 @@ class UnitTests(unittest.TestCase):
         expected_headers = {
             "Authorization": f"Bearer {mock_jwt_encode.return_value.decode.return_value}"
         }
-        mock_request_post.assert_called_once_with(
+        mock_request.assert_called_once_with(
+            "POST",
             "<pairing base URL>/v1/<realm name>/agent/devices",
-            json=expected_json,
             headers=expected_headers,
+            json=expected_json,
             verify=True,
             timeout=30,
         )
 
-    @mock.patch("astarte.device.pairing_handler.requests.post")
-    def test_register_device_with_jwt_token(self, mock_request_post):
+    @mock.patch("astarte.device.pairing_handler.requests.request")
+    def test_register_device_with_jwt_token(self, mock_request):
         # Mock return values for __register_device
-        mock_request_post.return_value.status_code = HTTPStatus.CREATED
-        mock_request_post.return_value.json.return_value = {
+        mock_request.return_value.status_code = HTTPStatus.CREATED
+        mock_request.return_value.json.return_value = {
             "data": {"credentials_secret": "<credential secret>"}
         }
 
@@ -547,15 +529,185 @@ class UnitTests(unittest.TestCase):
         # Checks for __register_device
         expected_json = {"data": {"hw_id": "<device id>"}}
         expected_headers = {"Authorization": "Bearer <jwt token>"}
-        mock_request_post.assert_called_once_with(
+        mock_request.assert_called_once_with(
+            "POST",
             "<pairing base URL>/v1/<realm name>/agent/devices",
-            json=expected_json,
             headers=expected_headers,
+            json=expected_json,
             verify=True,
             timeout=30,
         )
         self.assertEqual(result, "<credential secret>")
 
+    @mock.patch("astarte.device.pairing_handler.register_device_with_private_key")
+    def test_aregister_device_with_private_key(self, mock_register_device_with_private_key):
+        result = asyncio.run(
+            pairing_handler.aregister_device_with_private_key(
+                "<device id>",
+                "<realm name>",
+                "<private key file>",
+                "<pairing base URL>",
+                ignore_ssl_errors=False,
+            )
+        )
+
+        mock_register_device_with_private_key.assert_called_once_with(
+            "<device id>", "<realm name>", "<private key file>", "<pairing base URL>", False
+        )
+        self.assertEqual(result, mock_register_device_with_private_key.return_value)
+
+    @mock.patch("astarte.device.pairing_handler.register_device_with_jwt_token")
+    def test_aregister_device_with_jwt_token(self, mock_register_device_with_jwt_token):
+        result = asyncio.run(
+            pairing_handler.aregister_device_with_jwt_token(
+                device_id="<device id>",
+                realm="<realm name>",
+                jwt_token="<jwt token>",
+                pairing_base_url="<pairing base URL>",
+            )
+        )
+
+        mock_register_device_with_jwt_token.assert_called_once_with(
+            "<device id>", "<realm name>", "<jwt token>", "<pairing base URL>", False
+        )
+        self.assertEqual(result, mock_register_device_with_jwt_token.return_value)
+
+    @mock.patch("astarte.device.pairing_handler.requests.Session")
+    @mock.patch("astarte.device.pairing_handler.jwt.encode")
+    @mock.patch("astarte.device.pairing_handler.time")
+    @mock.patch("astarte.device.pairing_handler.Path")
+    def test_register_devices_with_private_key(
+        self, mock_path, mock_time, mock_jwt_encode, mock_session
+    ):
+        # Mock return values for __generate_token
+        mock_path.return_value.read_bytes.return_value = b"<private key content>"
+        mock_time.time.return_value = 1700000000.5
+
+        # Mock return values for __register_device
+        mock_session_post = mock_session.return_value.__enter__.return_value.request
+        mock_session_post.return_value.status_code = HTTPStatus.CREATED
+        mock_session_post.return_value.json.side_effect = [
+            {"data": {"credentials_secret": "<credential secret 1>"}},
+            {"data": {"credentials_secret": "<credential secret 2>"}},
+        ]
+
+        secrets, errors = pairing_handler.register_devices_with_private_key(
+            ["<device id 1>", "<device id 2>"],
+            "<realm name>",
+            "<private key file>",
+            "<pairing base URL>",
+            ignore_ssl_errors=False,
+        )
+
+        # The token is generated only once for all the devices
+        mock_path.return_value.read_bytes.assert_called_once()
+        mock_jwt_encode.assert_called_once()
+        mock_session.assert_called_once_with()
+
+        # Checks for __register_device
+        expected_headers = {
+            "Authorization": f"Bearer {mock_jwt_encode.return_value.decode.return_value}"
+        }
+        calls = [
+            mock.call(
+                "POST",
+                "<pairing base URL>/v1/<realm name>/agent/devices",
+                headers=expected_headers,
+                json={"data": {"hw_id": "<device id 1>"}},
+                verify=True,
+                timeout=30,
+            ),
+            mock.call().json(),
+            mock.call(
+                "POST",
+                "<pairing base URL>/v1/<realm name>/agent/devices",
+                headers=expected_headers,
+                json={"data": {"hw_id": "<device id 2>"}},
+                verify=True,
+                timeout=30,
+            ),
+            mock.call().json(),
+        ]
+        mock_session_post.assert_has_calls(calls)
+        self.assertEqual(
+            secrets,
+            {
+                "<device id 1>": "<credential secret 1>",
+                "<device id 2>": "<credential secret 2>",
+            },
+        )
+        self.assertEqual(errors, {})
+
+    @mock.patch("astarte.device.pairing_handler.requests.Session")
+    @mock.patch("astarte.device.pairing_handler.jwt.encode")
+    @mock.patch("astarte.device.pairing_handler.time")
+    @mock.patch("astarte.device.pairing_handler.Path")
+    def test_register_devices_with_private_key_partial_failure(
+        self, mock_path, mock_time, mock_jwt_encode, mock_session
+    ):
+        # Mock return values for __generate_token
+        mock_path.return_value.read_bytes.return_value = b"<private key content>"
+        mock_time.time.return_value = 1700000000.5
+
+        # The second registration fails, the first and third succeed
+        mock_session_post = mock_session.return_value.__enter__.return_value.request
+        created_1 = mock.MagicMock(status_code=HTTPStatus.CREATED)
+        created_1.json.return_value = {"data": {"credentials_secret": "<credential secret 1>"}}
+        already_registered = mock.MagicMock(status_code=HTTPStatus.UNPROCESSABLE_ENTITY)
+        created_3 = mock.MagicMock(status_code=HTTPStatus.CREATED)
+        created_3.json.return_value = {"data": {"credentials_secret": "<credential secret 3>"}}
+        mock_session_post.side_effect = [created_1, already_registered, created_3]
+
+        secrets, errors = pairing_handler.register_devices_with_private_key(
+            ["<device id 1>", "<device id 2>", "<device id 3>"],
+            "<realm name>",
+            "<private key file>",
+            "<pairing base URL>",
+            ignore_ssl_errors=False,
+        )
+
+        self.assertEqual(mock_session_post.call_count, 3)
+        self.assertEqual(
+            secrets,
+            {
+                "<device id 1>": "<credential secret 1>",
+                "<device id 3>": "<credential secret 3>",
+            },
+        )
+        self.assertEqual(list(errors), ["<device id 2>"])
+        self.assertIsInstance(errors["<device id 2>"], DeviceAlreadyRegisteredError)
+
+    @mock.patch("astarte.device.pairing_handler.requests.Session")
+    @mock.patch("astarte.device.pairing_handler.jwt.encode")
+    @mock.patch("astarte.device.pairing_handler.time")
+    @mock.patch("astarte.device.pairing_handler.Path")
+    def test_register_devices_with_private_key_malformed_body(
+        self, mock_path, mock_time, mock_jwt_encode, mock_session
+    ):
+        # Mock return values for __generate_token
+        mock_path.return_value.read_bytes.return_value = b"<private key content>"
+        mock_time.time.return_value = 1700000000.5
+
+        # A proxy answers the second registration with a non JSON body
+        mock_session_post = mock_session.return_value.__enter__.return_value.request
+        created = mock.MagicMock(status_code=HTTPStatus.CREATED)
+        created.json.return_value = {"data": {"credentials_secret": "<credential secret 1>"}}
+        bad_gateway = mock.MagicMock(status_code=HTTPStatus.BAD_GATEWAY)
+        bad_gateway.json.side_effect = json.JSONDecodeError("Expecting value", "<html>", 0)
+        mock_session_post.side_effect = [created, bad_gateway]
+
+        secrets, errors = pairing_handler.register_devices_with_private_key(
+            ["<device id 1>", "<device id 2>"],
+            "<realm name>",
+            "<private key file>",
+            "<pairing base URL>",
+            ignore_ssl_errors=False,
+        )
+
+        self.assertEqual(secrets, {"<device id 1>": "<credential secret 1>"})
+        self.assertEqual(list(errors), ["<device id 2>"])
+        self.assertIsInstance(errors["<device id 2>"], ValueError)
+
     @mock.patch("astarte.device.pairing_handler.urlsafe_b64encode")
     @mock.patch("astarte.device.pairing_handler.uuid5")
     def test_generate_device_id(self, mock_uuid5, mock_urlsafe_b64encode):
@@ -575,6 +727,18 @@ class UnitTests(unittest.TestCase):
             result, mock_urlsafe_b64encode.return_value.replace.return_value.decode.return_value
         )
 
+    def test_generate_device_ids(self):
+        namespace = UUID("f79ad91f-c638-4889-ae74-9d001a3b4cf8")
+        unique_data_list = ["<unique data 1>", "<unique data 2>", "", "àèìòù"]
+
+        result = pairing_handler.generate_device_ids(namespace, unique_data_list)
+
+        expected = [
+            pairing_handler.generate_device_id(namespace, unique_data)
+            for unique_data in unique_data_list
+        ]
+        self.assertEqual(result, expected)
+
     @mock.patch("astarte.device.pairing_handler.urlsafe_b64encode")
     @mock.patch("astarte.device.pairing_handler.uuid4")
     def test_generate_random_device_id(self, mock_uuid4, mock_urlsafe_b64encode):
@@ -591,11 +755,11 @@ class UnitTests(unittest.TestCase):
             result, mock_urlsafe_b64encode.return_value.replace.return_value.decode.return_value
         )
 
-    @mock.patch("astarte.device.pairing_handler.requests.post")
+    @mock.patch("astarte.device.pairing_handler.requests.request")
     @mock.patch("astarte.device.pairing_handler.crypto")
-    def test_obtain_device_certificate(self, mock_crypto, mock_request_post):
-        mock_request_post.return_value.status_code = HTTPStatus.CREATED
-        mock_request_post.return_value.json.return_value = {"data": {"client_crt": "<client crt>"}}
+    def test_obtain_device_certificate(self, mock_crypto, mock_request):
+        mock_request.return_value.status_code = HTTPStatus.CREATED
+        mock_request.return_value.json.return_value = {"data": {"client_crt": "<client crt>"}}
 
         pairing_handler.obtain_device_certificate(
             device_id="<device id>",
@@ -611,24 +775,26 @@ class UnitTests(unittest.TestCase):
         )
         expected_json = {"data": {"csr": mock_crypto.generate_csr.return_value.decode.return_value}}
         expected_headers = {"Authorization": "Bearer <credentials secret>"}
-        mock_request_post.assert_called_once_with(
+        mock_request.assert_called_once_with(
+            "POST",
             "<pairing base URL>/v1/<realm name>/devices/<device id>/protocols/astarte_mqtt_v1/credentials",
-            json=expected_json,
             headers=expected_headers,
+            json=expected_json,
             verify=False,
             timeout=30,
         )
+        mock_request.return_value.json.assert_called_once()
         mock_crypto.import_device_certificate.assert_called_once_with(
             "<client crt>", "<crypto store dir>"
         )
 
-    @mock.patch("astarte.device.pairing_handler.requests.post")
+    @mock.patch("astarte.device.pairing_handler.requests.request")
     @mock.patch("astarte.device.pairing_handler.crypto")
     def test_obtain_device_certificate_http_post_unautorized_raises(
-        self, mock_crypto, mock_request_post
+        self, mock_crypto, mock_request
     ):
-        mock_request_post.return_value.status_code = HTTPStatus.UNAUTHORIZED
-        mock_request_post.return_value.json.return_value = {"data": {"client_crt": "<client crt>"}}
+        mock_request.return_value.status_code = HTTPStatus.UNAUTHORIZED
+        mock_request.return_value.json.return_value = {"data": {"client_crt": "<client crt>"}}
 
         self.assertRaises(
             AuthorizationError,
@@ -647,22 +813,21 @@ class UnitTests(unittest.TestCase):
         )
         expected_json = {"data": {"csr": mock_crypto.generate_csr.return_value.decode.return_value}}
         expected_headers = {"Authorization": "Bearer <credentials secret>"}
-        mock_request_post.assert_called_once_with(
+        mock_request.assert_called_once_with(
+            "POST",
             "<pairing base URL>/v1/<realm name>/devices/<device id>/protocols/astarte_mqtt_v1/credentials",
-            json=expected_json,
             headers=expected_headers,
+            json=expected_json,
             verify=False,
             timeout=30,
         )
         mock_crypto.import_device_certificate.assert_not_called()
 
-    @mock.patch("astarte.device.pairing_handler.requests.post")
+    @mock.patch("astarte.device.pairing_handler.requests.request")
     @mock.patch("astarte.device.pairing_handler.crypto")
-    def test_obtain_device_certificate_http_post_forbidden_raises(
-        self, mock_crypto, mock_request_post
-    ):
-        mock_request_post.return_value.status_code = HTTPStatus.FORBIDDEN
-        mock_request_post.return_value.json.return_value = {"data": {"client_crt": "<client crt>"}}
+    def test_obtain_device_certificate_http_post_forbidden_raises(self, mock_crypto, mock_request):
+        mock_request.return_value.status_code = HTTPStatus.FORBIDDEN
+        mock_request.return_value.json.return_value = {"data": {"client_crt": "<client crt>"}}
 
         self.assertRaises(
             AuthorizationError,
@@ -681,20 +846,21 @@ class UnitTests(unittest.TestCase):
         )
         expected_json = {"data": {"csr": mock_crypto.generate_csr.return_value.decode.return_value}}
         expected_headers = {"Authorization": "Bearer <credentials secret>"}
-        mock_request_post.assert_called_once_with(
+        mock_request.assert_called_once_with(
+            "POST",
             "<pairing base URL>/v1/<realm name>/devices/<device id>/protocols/astarte_mqtt_v1/credentials",
-            json=expected_json,
             headers=expected_headers,
+            json=expected_json,
             verify=False,
             timeout=30,
         )
         mock_crypto.import_device_certificate.assert_not_called()
 
-    @mock.patch("astarte.device.pairing_handler.requests.post")
+    @mock.patch("astarte.device.pairing_handler.requests.request")
     @mock.patch("astarte.device.pairing_handler.crypto")
-    def test_obtain_device_certificate_http_post_other_raises(self, mock_crypto, mock_request_post):
-        mock_request_post.return_value.status_code = HTTPStatus.REQUEST_TIMEOUT
-        mock_request_post.return_value.json.return_value = {"data": {"client_crt": "<client crt>"}}
+    def test_obtain_device_certificate_http_post_other_raises(self, mock_crypto, mock_request):
+        mock_request.return_value.status_code = HTTPStatus.REQUEST_TIMEOUT
+        mock_request.return_value.json.return_value = {"data": {"client_crt": "<client crt>"}}
 
         self.assertRaises(
             APIError,
@@ -713,19 +879,128 @@ class UnitTests(unittest.TestCase):
         )
         expected_json = {"data": {"csr": mock_crypto.generate_csr.return_value.decode.return_value}}
         expected_headers = {"Authorization": "Bearer <credentials secret>"}
-        mock_request_post.assert_called_once_with(
+        mock_request.assert_called_once_with(
+            "POST",
             "<pairing base URL>/v1/<realm name>/devices/<device id>/protocols/astarte_mqtt_v1/credentials",
-            json=expected_json,
             headers=expected_headers,
+            json=expected_json,
             verify=False,
             timeout=30,
         )
         mock_crypto.import_device_certificate.assert_not_called()
 
-    @mock.patch("astarte.device.pairing_handler.requests.get")
-    def test_obtain_device_transport_information(self, mock_request_get):
-        mock_request_get.return_value.status_code = HTTPStatus.OK
-        mock_request_get.return_value.json.return_value = {"data": "<device transport information>"}
+    @mock.patch("astarte.device.pairing_handler.requests.request")
+    def test_verify_device_certificate(self, mock_request):
+        mock_request.return_value.status_code = HTTPStatus.OK
+        mock_request.return_value.json.return_value = {"data": {"valid": True}}
+
+        result = pairing_handler.verify_device_certificate(
+            device_id="<device id>",
+            realm="<realm name>",
+            credentials_secret="<credentials secret>",
+            pairing_base_url="<pairing base URL>",
+            ignore_ssl_errors=False,
+            cert_pem="<cert pem>",
+        )
+
+        expected_json = {"data": {"client_crt": "<cert pem>"}}
+        expected_headers = {"Authorization": "Bearer <credentials secret>"}
+        mock_request.assert_called_once_with(
+            "POST",
+            "<pairing base URL>/v1/<realm name>/devices/<device id>/protocols/astarte_mqtt_v1/credentials/verify",
+            headers=expected_headers,
+            json=expected_json,
+            verify=True,
+            timeout=30,
+        )
+        mock_request.return_value.json.assert_called_once()
+        self.assertTrue(result)
+
+    @mock.patch("astarte.device.pairing_handler.requests.request")
+    def test_verify_device_certificate_not_cached_by_default(self, mock_request):
+        mock_request.return_value.status_code = HTTPStatus.OK
+        mock_request.return_value.json.return_value = {"data": {"valid": True}}
+
+        for _ in range(2):
+            self.assertTrue(
+                pairing_handler.verify_device_certificate(
+                    device_id="<device id>",
+                    realm="<realm name>",
+                    credentials_secret="<credentials secret>",
+                    pairing_base_url="<pairing base URL>",
+                    ignore_ssl_errors=False,
+                    cert_pem="<cert pem>",
+                )
+            )
+        self.assertEqual(mock_request.call_count, 2)
+
+    @mock.patch("astarte.device.pairing_handler.time")
+    @mock.patch("astarte.device.pairing_handler.requests.request")
+    def test_verify_device_certificate_cached(self, mock_request, mock_time):
+        mock_request.return_value.status_code = HTTPStatus.OK
+        mock_request.return_value.json.return_value = {"data": {"valid": True}}
+        mock_time.monotonic.return_value = 100.0
+
+        def verify(realm="<realm name>", credentials_secret="<credentials secret>"):
+            return pairing_handler.verify_device_certificate(
+                device_id="<device id>",
+                realm=realm,
+                credentials_secret=credentials_secret,
+                pairing_base_url="<pairing base URL>",
+                ignore_ssl_errors=False,
+                cert_pem="<cert pem>",
+                use_cache=True,
+            )
+
+        # The second verification is served from the cache
+        self.assertTrue(verify())
+        mock_time.monotonic.return_value = 100.0 + pairing_handler.VERIFY_CACHE_TTL - 1
+        self.assertTrue(verify())
+        mock_request.assert_called_once()
+
+        # A different realm or credentials secret is not served from the cache
+        self.assertTrue(verify(realm="<other realm name>"))
+        self.assertEqual(mock_request.call_count, 2)
+        mock_request.return_value.status_code = HTTPStatus.UNAUTHORIZED
+        with self.assertRaises(AuthorizationError):
+            verify(credentials_secret="<wrong credentials secret>")
+        self.assertEqual(mock_request.call_count, 3)
+        mock_request.return_value.status_code = HTTPStatus.OK
+
+        # The cached result expires after the TTL, invalid results are not cached
+        mock_time.monotonic.return_value = 100.0 + pairing_handler.VERIFY_CACHE_TTL
+        mock_request.return_value.json.return_value = {"data": {"valid": False}}
+        self.assertFalse(verify())
+        self.assertEqual(mock_request.call_count, 4)
+        mock_request.return_value.json.return_value = {"data": {"valid": True}}
+        self.assertTrue(verify())
+        self.assertEqual(mock_request.call_count, 5)
+
+        # Clearing the cache forces a new verification
+        pairing_handler.clear_verify_cache()
+        self.assertTrue(verify())
+        self.assertEqual(mock_request.call_count, 6)
+
+    @mock.patch("astarte.device.pairing_handler.requests.request")
+    def test_verify_device_certificate_null_data(self, mock_request):
+        mock_request.return_value.status_code = HTTPStatus.OK
+        mock_request.return_value.json.return_value = {"data": None}
+
+        result = pairing_handler.verify_device_certificate(
+            device_id="<device id>",
+            realm="<realm name>",
+            credentials_secret="<credentials secret>",
+            pairing_base_url="<pairing base URL>",
+            ignore_ssl_errors=False,
+            cert_pem="<cert pem>",
+        )
+
+        self.assertFalse(result)
+
+    @mock.patch("astarte.device.pairing_handler.requests.request")
+    def test_obtain_device_transport_information(self, mock_request):
+        mock_request.return_value.status_code = HTTPStatus.OK
+        mock_request.return_value.json.return_value = {"data": "<device transport information>"}
 
         result = pairing_handler.obtain_device_transport_information(
             device_id="<device id>",
@@ -736,18 +1011,20 @@ class UnitTests(unittest.TestCase):
         )
 
         expected_headers = {"Authorization": "Bearer <credentials secret>"}
-        mock_request_get.assert_called_once_with(
+        mock_request.assert_called_once_with(
+            "GET",
             "<pairing base URL>/v1/<realm name>/devices/<device id>",
             headers=expected_headers,
+            json=None,
             verify=False,
             timeout=30,
         )
         self.assertEqual(result, "<device transport information>")
 
-    @mock.patch("astarte.device.pairing_handler.requests.get")
-    def test_obtain_device_transport_information_http_get_forbidden_raises(self, mock_request_get):
-        mock_request_get.return_value.status_code = HTTPStatus.FORBIDDEN
-        mock_request_get.return_value.json.return_value = {"data": "<device transport information>"}
+    @mock.patch("astarte.device.pairing_handler.requests.request")
+    def test_obtain_device_transport_information_http_get_forbidden_raises(self, mock_request):
+        mock_request.return_value.status_code = HTTPStatus.FORBIDDEN
+        mock_request.return_value.json.return_value = {"data": "<device transport information>"}
 
         self.assertRaises(
             AuthorizationError,
@@ -761,19 +1038,19 @@ class UnitTests(unittest.TestCase):
         )
 
         expected_headers = {"Authorization": "Bearer <credentials secret>"}
-        mock_request_get.assert_called_once_with(
+        mock_request.assert_called_once_with(
+            "GET",
             "<pairing base URL>/v1/<realm name>/devices/<device id>",
             headers=expected_headers,
+            json=None,
             verify=False,
             timeout=30,
         )
 
-    @mock.patch("astarte.device.pairing_handler.requests.get")
-    def test_obtain_device_transport_information_http_get_unautohrized_raises(
-        self, mock_request_get
-    ):
-        mock_request_get.return_value.status_code = HTTPStatus.UNAUTHORIZED
-        mock_request_get.return_value.json.return_value = {"data": "<device transport information>"}
+    @mock.patch("astarte.device.pairing_handler.requests.request")
+    def test_obtain_device_transport_information_http_get_unautohrized_raises(self, mock_request):
+        mock_request.return_value.status_code = HTTPStatus.UNAUTHORIZED
+        mock_request.return_value.json.return_value = {"data": "<device transport information>"}
 
         self.assertRaises(
             AuthorizationError,
@@ -787,17 +1064,19 @@ class UnitTests(unittest.TestCase):
         )
 
         expected_headers = {"Authorization": "Bearer <credentials secret>"}
-        mock_request_get.assert_called_once_with(
+        mock_request.assert_called_once_with(
+            "GET",
             "<pairing base URL>/v1/<realm name>/devices/<device id>",
             headers=expected_headers,
+            json=None,
             verify=False,
             timeout=30,
         )
 
-    @mock.patch("astarte.device.pairing_handler.requests.get")
-    def test_obtain_device_transport_information_http_get_other_raises(self, mock_request_get):
-        mock_request_get.return_value.status_code = HTTPStatus.REQUEST_TIMEOUT
-        mock_request_get.return_value.json.return_value = {"data": "<device transport information>"}
+    @mock.patch("astarte.device.pairing_handler.requests.request")
+    def test_obtain_device_transport_information_http_get_other_raises(self, mock_request):
+        mock_request.return_value.status_code = HTTPStatus.REQUEST_TIMEOUT
+        mock_request.return_value.json.return_value = {"data": "<device transport information>"}
 
         self.assertRaises(
             APIError,
@@ -811,9 +1090,11 @@ class UnitTests(unittest.TestCase):
         )
 
         expected_headers = {"Authorization": "Bearer <credentials secret>"}
-        mock_request_get.assert_called_once_with(
+        mock_request.assert_called_once_with(
+            "GET",
             "<pairing base URL>/v1/<realm name>/devices/<device id>",
             headers=expected_headers,
+            json=None,
             verify=False,
             timeout=30,
         )